@@ -1 +1,18 @@
-from .layout import Plasma
+import sys
+
+if sys.version_info >= (3, 7):
+    # Import the layout (and with it Qtile) only when it's accessed, so the
+    # tree engine and debugging tools can be used on their own.
+    def __getattr__(name):
+        if name == 'Plasma':
+            # pylint: disable=import-outside-toplevel
+            from .layout import Plasma
+            globals()['Plasma'] = Plasma
+            return Plasma
+        raise AttributeError('module %r has no attribute %r' %
+                             (__name__, name))
+
+    def __dir__():
+        return sorted(list(globals()) + ['Plasma'])
+else:
+    from .layout import Plasma
@@ -1,4 +1,6 @@
-from collections import defaultdict
+import json
+
+from .sizing import FLIPPED, HORIZONTAL, pixel_perfect
 
 
 class Canvas:
@@ -9,67 +11,245 @@ class Canvas:
     tr_corner = '\u2510'
     bl_corner = '\u2514'
     br_corner = '\u2518'
+    background = '#'
+    fill = '.'
+    tiny_fill = '+'
 
     def __init__(self, width, height):
         self.width = width
         self.height = height
-        self.canvas = defaultdict(lambda: defaultdict(lambda: '#'))
+        self.rows = [[self.background] * width for _ in range(height)]
+
+    def put(self, x, y, text):
+        """Write `text` into row `y` from column `x`, clipped to the canvas."""
+        if not 0 <= y < self.height:
+            return
+        if x < 0:
+            text = text[-x:]
+            x = 0
+        text = text[:self.width-x]
+        self.rows[y][x:x+len(text)] = text
 
     def add_box(self, x, y, width, height, name='*'):
+        if width < 2 or height < 2:
+            # Too small for a frame, just mark the area
+            for j in range(y, y+height):
+                self.put(x, j, self.tiny_fill * width)
+            return
         width = width-1
         height = height-1
         label = str(name)[:width-1]
-        for i in range(x, width+x):
-            self.canvas[i][y] = self.horizontal_line
-            self.canvas[i][y+height] = self.horizontal_line
-        for i in range(y, height+y):
-            self.canvas[x][i] = self.vertical_line
-            self.canvas[x+width][i] = self.vertical_line
-        for i in range(x+1, width+x):
-            for j in range(y+1, y+height):
-                self.canvas[i][j] = '.'
-        for i, char in enumerate(label):
-            self.canvas[x+1+i][y+1] = char
-        self.canvas[x][y] = self.tl_corner
-        self.canvas[x+width][y] = self.tr_corner
-        self.canvas[x][y+height] = self.bl_corner
-        self.canvas[x+width][y+height] = self.br_corner
+        inner = width - 1
+        self.put(x, y, self.tl_corner + self.horizontal_line * inner +
+                 self.tr_corner)
+        middle = self.vertical_line + self.fill * inner + self.vertical_line
+        for j in range(y+1, y+height):
+            self.put(x, j, middle)
+        self.put(x, y+height, self.bl_corner + self.horizontal_line * inner +
+                 self.br_corner)
+        if height > 1:
+            self.put(x+1, y+1, label)
 
     def view(self):
-        res = ''
-        for y in range(self.height):
-            for x in range(self.width):
-                res += self.canvas[x][y]
-            res += '\n'
-        return res
-
-def tree(node, level=0):
-    res = '{indent}{name} {orient} {repr_} {pos} {size} {parent}\n'.format(
-        indent=level*4*' ',
-        name='%s' % (node.payload or '*'),
-        orient='H' if node.horizontal else 'V',
-        repr_='%s' % repr(node),
-        pos='%g*%g@%g:%g' % (node.width, node.height, node.x, node.y),
-        size='size: %s%s' % (node.size, ' (auto)' if node.flexible else ''),
-        parent='p: %s' % node.parent,
-    )
-    for child in node:
-        res += tree(child, level+1)
-    return res
-
-def draw(root):
-    canvas = Canvas(root.width, root.height)
-    def add(node):
-        if node.is_leaf:
-            canvas.add_box(
-                *node.pixel_perfect,
-                node.payload
-            )
-        for child in node:
-            add(child)
-    add(root)
+        return ''.join(''.join(row) + '\n' for row in self.rows)
+
+def walk(node):
+    """Yield each node of the tree in pre-order as `(node, depth, orient,
+    geo)`, where `geo` is the node's geometry or None if it isn't shown.
+
+    Unlike `geometry()`, this includes minimized nodes and hidden children of
+    tabbed and stacked containers (with their subtrees).
+    """
+    shown = {geo.node: geo for geo in node.geometry()}
+    stack = [(node, 0, node.orient)]
+    while stack:
+        n, depth, orient = stack.pop()
+        yield n, depth, orient, shown.get(n)
+        stack.extend((c, depth + 1, FLIPPED[orient]) for c in reversed(n))
+
+def tree_records(node):
+    """Yield a dict describing each node of the tree in pre-order."""
+    for n, depth, orient, geo in walk(node):
+        yield {
+            'name': None if n.payload is None else str(n.payload),
+            'depth': depth,
+            'orient': 'H' if orient is HORIZONTAL else 'V',
+            'x': geo and geo.x,
+            'y': geo and geo.y,
+            'width': geo and geo.width,
+            'height': geo and geo.height,
+            'size': geo and geo.size,
+            'fixed': n.fixed,
+            'flexible': bool(geo and geo.flexible),
+            'hidden': geo is None,
+            'minimized': n.minimized,
+        }
+
+def tree_lines(node):
+    """Yield a line describing each node of the tree in pre-order.
+
+    Nodes which aren't shown are marked as minimized or hidden instead of
+    their geometry.
+    """
+    for n, depth, orient, geo in walk(node):
+        if geo is None:
+            pos = 'minimized' if n.minimized else 'hidden'
+            size = 'size: -'
+        else:
+            pos = '%g*%g@%g:%g' % (geo.width, geo.height, geo.x, geo.y)
+            size = 'size: %s%s' % (geo.size, ' (auto)' if geo.flexible else '')
+        yield '{indent}{name} {orient} {repr_} {pos} {size} {parent}\n'.format(
+            indent=depth*4*' ',
+            name='%s' % (n.payload or '*'),
+            orient='H' if orient is HORIZONTAL else 'V',
+            repr_='%s' % repr(n),
+            pos=pos,
+            size=size,
+            parent='p: %s' % n.parent,
+        )
+
+def dump_tree(node, file, fmt='text'):
+    """Write the tree to the file object `file`, either as text or as JSON
+    records, one per line.
+    """
+    if fmt == 'json':
+        for record in tree_records(node):
+            file.write(json.dumps(record) + '\n')
+    else:
+        file.writelines(tree_lines(node))
+
+def tree(node):
+    return ''.join(tree_lines(node))
+
+def draw(root, width=None, height=None):
+    """Draw the leafs of the tree as boxes.
+
+    If `width` or `height` is given, the layout is scaled down to a grid of
+    that size (a missing dimension is derived assuming text cells are twice
+    as high as wide), so even layouts of large screens can be drawn.
+    """
+    if width is None and height is None:
+        width, height = root.width, root.height
+    elif height is None:
+        height = max(round(root.height * width / root.width / 2), 1)
+    elif width is None:
+        width = max(round(root.width * height / root.height * 2), 1)
+    scale_x = width / root.width
+    scale_y = height / root.height
+    canvas = Canvas(int(width), int(height))
+    for geo in root.geometry():
+        node = geo.node
+        if node:
+            continue
+        x, y, w, h = pixel_perfect(geo.x, geo.y, geo.width, geo.height)
+        x -= root.x
+        y -= root.y
+        if scale_x == scale_y == 1:
+            canvas.add_box(x, y, w, h, node.payload)
+            continue
+        # Scale start and end points, so adjacent boxes stay adjacent
+        x_start, x_end = int(x * scale_x), int((x + w) * scale_x)
+        y_start, y_end = int(y * scale_y), int((y + h) * scale_y)
+        canvas.add_box(x_start, y_start, x_end - x_start, y_end - y_start,
+                       node.payload)
     return canvas.view()
 
-def info(node):
+# Border colors of the layout's default config
+default_colors = {
+    'border_normal': '#333333',
+    'border_focus': '#00e891',
+    'border_normal_fixed': '#333333',
+    'border_focus_fixed': '#00e8dc',
+}
+
+def leaf_rects(root, focused=None, colors=None):
+    """Yield the pixel-perfect rect (relative to the root) and border color of
+    each leaf as (x, y, width, height, color).
+    """
+    colors = dict(default_colors, **(colors or {}))
+    for geo in root.geometry():
+        node = geo.node
+        if node:
+            continue
+        x, y, width, height = pixel_perfect(geo.x, geo.y, geo.width,
+                                            geo.height)
+        color = colors['border_' +
+                       ('focus' if node.payload == focused else 'normal') +
+                       ('' if geo.flexible else '_fixed')]
+        yield x - root.x, y - root.y, width, height, color
+
+def rgb(color):
+    return bytes.fromhex(color.lstrip('#'))
+
+def export_ppm(root, file, focused=None, colors=None, border_width=1,
+               fill='#000000', background='#ff00ff'):
+    """Write an image of the layout in binary PPM format to the file object
+    `file`.
+
+    Each leaf is drawn at screen resolution with a border in the color the
+    layout would use (`colors` takes the layout's `border_*` options). Areas
+    not covered by any leaf are drawn in `background`, so gaps stand out.
+    """
+    width, height = int(root.width), int(root.height)
+    fill = rgb(fill)
+    boxes = []
+    breaks = {0, height}
+    for x, y, w, h, color in leaf_rects(root, focused, colors):
+        x_start, x_end = max(x, 0), min(x + w, width)
+        y_start, y_end = max(y, 0), min(y + h, height)
+        if x_start >= x_end or y_start >= y_end:
+            continue
+        color = rgb(color)
+        edge = color * (x_end - x_start)
+        inner = w - 2 * border_width
+        if inner > 0:
+            middle = color * border_width + fill * inner + color * border_width
+            middle = middle[(x_start-x)*3:(x_end-x)*3]
+        else:
+            middle = edge
+        top, bottom = y + border_width, y + h - border_width
+        boxes.append((y_start, y_end, top, bottom, x_start * 3, x_end * 3,
+                      edge, middle))
+        breaks.update(v for v in (y_start, y_end, top, bottom)
+                      if 0 <= v <= height)
+    boxes.sort(key=lambda b: b[0])
+    blank = rgb(background) * width
+    file.write(b'P6\n%d %d\n255\n' % (width, height))
+    active = []
+    next_box = 0
+    breaks = sorted(breaks)
+    # Rows only change at box borders, so each band between two breaks is
+    # built once and written as a whole.
+    for band_start, band_end in zip(breaks, breaks[1:]):
+        active = [b for b in active if b[1] > band_start]
+        while next_box < len(boxes) and boxes[next_box][0] <= band_start:
+            active.append(boxes[next_box])
+            next_box += 1
+        row = bytearray(blank)
+        for _, _, top, bottom, start, end, edge, middle in active:
+            row[start:end] = middle if top <= band_start < bottom else edge
+        file.write(bytes(row) * (band_end - band_start))
+
+def export_svg(root, file, focused=None, colors=None, border_width=1,
+               fill='#000000', background='#ff00ff'):
+    """Write an image of the layout in SVG format to the text file object
+    `file` (see `export_ppm()`).
+    """
+    width, height = root.width, root.height
+    file.write('<svg xmlns="http://www.w3.org/2000/svg" width="%d" '
+               'height="%d">\n' % (width, height))
+    file.write('<rect width="%d" height="%d" fill="%s"/>\n' %
+               (width, height, background))
+    for x, y, w, h, color in leaf_rects(root, focused, colors):
+        file.write('<rect x="%d" y="%d" width="%d" height="%d" fill="%s"/>\n'
+                   % (x, y, w, h, color))
+        inner_w, inner_h = w - 2 * border_width, h - 2 * border_width
+        if inner_w > 0 and inner_h > 0:
+            file.write('<rect x="%d" y="%d" width="%d" height="%d" '
+                       'fill="%s"/>\n' % (x + border_width, y + border_width,
+                                          inner_w, inner_h, fill))
+    file.write('</svg>\n')
+
+def info(node, width=None, height=None):
     print(tree(node))
-    print(draw(node))
+    print(draw(node, width, height))
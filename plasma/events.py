@@ -0,0 +1,63 @@
+"""Notification of layout changes.
+
+Consumers subscribe a callback, which is called at the end of each layout
+pass with the list of events since the previous pass, so they can keep their
+own state up to date instead of polling the whole tree. Events are only
+collected while there are subscribers.
+
+Each event is of the form `(kind, window, data)`, with these kinds:
+
+- `add`, `remove`: a window was added to or removed from the layout
+- `move`: a window was moved or integrated
+- `resize`: a window was resized
+- `focus`: a window got the focus
+- `geometry`: the rects of windows changed; `data` maps each window to its
+  new rect (x, y, width, height), or to None if it isn't visible anymore
+  (`window` is None)
+"""
+
+from collections import namedtuple
+
+
+Event = namedtuple('Event', 'kind window data')
+
+
+class Events:
+
+    def __init__(self):
+        self.subscribers = []
+        self.pending = []
+        self.rects = {}
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+        if not self.subscribers:
+            self.pending = []
+            self.rects = {}
+
+    def emit(self, kind, window, data=None):
+        if self.subscribers:
+            self.pending.append(Event(kind, window, data))
+
+    def flush(self, rects):
+        """Deliver the pending events to all subscribers.
+
+        `rects` are the current rects of the visible windows. The rects that
+        changed since the previous call are delivered as a `geometry` event.
+        """
+        if not self.subscribers:
+            return
+        changed = {w: r for w, r in rects.items() if self.rects.get(w) != r}
+        changed.update((w, None) for w in self.rects if w not in rects)
+        self.rects = rects
+        if changed:
+            self.pending.append(Event('geometry', None, changed))
+        events, self.pending = self.pending, []
+        if not events:
+            return
+        for callback in self.subscribers[:]:
+            callback(events)
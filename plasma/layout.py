@@ -1,11 +1,21 @@
+from collections import OrderedDict
 import copy
+import time
 
 from xcffib.xproto import StackMode
+from libqtile import hook
 from libqtile.layout.base import Layout
 
-from .node import Node, AddMode, NotRestorableError
+from . import profiling, trace
+from .events import Events
+from .record import Recorder
+from .node import (Node, ProportionalNode, AddMode, ContainerMode, Direction,
+                   NotRestorableError, pixel_perfect)
+from .timing import Latencies, instrument
 
 
+@instrument('add', 'remove', 'configure', 'focus', 'insert_queued',
+            '_scheduled_refocus')
 class Plasma(Layout):
     """A flexible tree-based layout.
 
@@ -26,17 +36,90 @@ class Plasma(Layout):
         ('border_width', 1, 'Border width'),
         ('border_width_single', 0, 'Border width for single window'),
         ('margin', 0, 'Layout margin'),
+        ('latency_samples', 1000,
+         'Number of recent latency samples kept per command (0 disables '
+         'timing)'),
+        ('trace_path', None,
+         'File to write a Chrome trace of layout operations to (tracing is '
+         'disabled if not set)'),
+        ('exact_geometry', False,
+         'Compute the layout in integer pixels, so window edges line up '
+         'exactly'),
+        ('proportional_sizes', False,
+         'Store window sizes relative to the screen, so they scale along when '
+         'the screen dimensions change (can\'t be combined with '
+         'exact_geometry)'),
+        ('resize_frame_interval', 0,
+         'Interval (in seconds) in which the relayouts of repeated resize '
+         'commands are coalesced into one (0 relayouts after each command)'),
+        ('add_queue_delay', 0,
+         'Time (in seconds) to wait for more windows after a window was '
+         'added, so windows mapped at once are inserted and laid out together '
+         '(0 adds each window immediately)'),
+        ('add_queue_max_delay', 0.5,
+         'Maximum time (in seconds) a window waits in the add queue'),
     ]
     # If windows are added before configure() was called, the screen size is
     # still unknown, so we need to set some arbitrary initial root dimensions
     default_dimensions = (0, 0, 1000, 1000)
+    # Number of recent infos kept for cmd_info_since()
+    info_history = 16
 
     def __init__(self, **config):
         Layout.__init__(self, **config)
         self.add_defaults(Plasma.defaults)
-        self.root = Node(None, *self.default_dimensions)
+        self.node_class = self._node_class()
+        self._init_state()
+        if self.trace_path and trace.tracer is None:
+            self._tracer = trace.start(self.trace_path)
+
+    def _init_state(self):
+        """Set up the state of a new, empty layout."""
+        self.root = self.node_class(None, *self.default_dimensions)
         self.focused = None
         self.add_mode = None
+        self._geometry = {}
+        self._geometry_key = None
+        self.hidden = set()
+        self.zoomed = None
+        self._unzoomed_geometry = None
+        self._infos = OrderedDict()
+        self._info_version = 0
+        # The tree of window names, kept until the tree changes or a window
+        # is renamed
+        self._names = None
+        self._names_key = None
+        self._batch_depth = 0
+        self._refocus_handle = None
+        self._nodes = {}
+        self._queued = []
+        self._queue_anchor = None
+        self._queue_start = None
+        self._queue_handle = None
+        self.events = Events()
+        self.latencies = self._new_latencies()
+        self.recorder = None
+        # The tracer started by this layout (if any)
+        self._tracer = None
+        hook.subscribe.client_name_updated(self._window_renamed)
+
+    def _node_class(self):
+        """Return the node class which implements the configured geometry
+        options.
+        """
+        if self.proportional_sizes:
+            if self.exact_geometry:
+                raise ValueError('proportional_sizes and exact_geometry '
+                                 'can\'t be combined')
+            return ProportionalNode
+        if self.exact_geometry:
+            return type('Node', (Node,), {'exact': True})
+        return Node
+
+    def _new_latencies(self):
+        if not self.latency_samples:
+            return None
+        return Latencies(self.latency_samples)
 
     @staticmethod
     def convert_names(tree):
@@ -45,99 +128,435 @@ class Plasma(Layout):
 
     @property
     def focused_node(self):
-        return self.root.find_payload(self.focused)
+        # Commands act on the complete tree
+        self.add_queued()
+        return self.find_node(self.focused)
+
+    def find_node(self, client):
+        """Return the node of `client`."""
+        try:
+            return self._nodes[client]
+        except KeyError:
+            # E.g. trees loaded from a recording aren't indexed
+            return self.root.find_payload(client)
+
+    @staticmethod
+    def tree_changes(old, new):
+        """Return the changed subtrees between two trees of names as a list
+        of `[path, subtree]`, where `path` are the child indices from the
+        root.
+        """
+        changes = []
+        stack = [([], old, new)]
+        while stack:
+            path, old, new = stack.pop()
+            if old == new:
+                continue
+            if (isinstance(old, list) and isinstance(new, list) and
+                    len(old) == len(new)):
+                stack.extend((path + [i], o, n) for i, (o, n) in
+                             reversed(list(enumerate(zip(old, new)))))
+            else:
+                changes.append([path, new])
+        return changes
 
     def info(self):
+        """Return the layout info, including the tree of window names and a
+        version, which is increased whenever the info changes.
+        """
         info = super().info()
-        info['tree'] = self.convert_names(self.root.tree)
-        return info
+        root = self.root
+        key = (root, root.version)
+        if key != self._names_key:
+            self._names = self.convert_names(root.tree)
+            self._names_key = key
+        info['tree'] = self._names
+        infos = self._infos
+        if not infos or infos[self._info_version] != info:
+            self._info_version += 1
+            infos[self._info_version] = info
+            if len(infos) > self.info_history:
+                infos.popitem(last=False)
+        return dict(info, version=self._info_version)
+
+    def _window_renamed(self, window):
+        if window in self._nodes:
+            self._names_key = None
+
+    def finalize(self):
+        self.cancel_refocus()
+        if self._queue_handle is not None:
+            self._queue_handle.cancel()
+            self._queue_handle = None
+        # Other layouts may still be traced
+        if self._tracer is not None and self._tracer is trace.tracer:
+            trace.stop()
+        self._tracer = None
+        hook.unsubscribe.client_name_updated(self._window_renamed)
+        self.cmd_stop_recording()
 
     def clone(self, group):
         clone = copy.copy(self)
         clone.group = group
-        clone.root = Node(None, *self.default_dimensions)
-        clone.focused = None
-        clone.add_mode = None
+        clone._init_state()  # pylint: disable=protected-access
         return clone
 
+    def subscribe(self, callback):
+        """Call `callback` with the list of layout events (see
+        `plasma.events`) at the end of each layout pass.
+        """
+        return self.events.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self.events.unsubscribe(callback)
+
     def add(self, client):
+        self.events.emit('add', client)
+        if self.add_queue_delay and self.add_mode is None:
+            self.queue_add(client)
+            return
+        # (Accessing the focused node inserts any queued windows first)
+        self.unzoom()
         node = self.root if self.focused_node is None else self.focused_node
-        new = Node(client)
+        new = self._nodes[client] = self.node_class(client)
         try:
             self.root.restore(new)
         except NotRestorableError:
             node.add_node(new, self.add_mode)
         self.add_mode = None
 
+    def queue_add(self, client):
+        """Queue `client` to be inserted together with the windows added
+        shortly after it.
+
+        (Windows are only queued if no add mode is set, since they are
+        inserted as siblings.)
+
+        The queue is inserted once no window was added for `add_queue_delay`
+        seconds, but at most `add_queue_max_delay` seconds after the first
+        window was queued. Queued windows are hidden until then.
+        """
+        now = time.monotonic()
+        if not self._queued:
+            self._queue_start = now
+            self._queue_anchor = self.focused_node
+        self._queued.append(client)
+        if self._queue_handle is not None:
+            self._queue_handle.cancel()
+        max_delay = self.add_queue_max_delay - (now - self._queue_start)
+        self._queue_handle = self.group.qtile.call_later(
+            max(min(self.add_queue_delay, max_delay), 0), self.insert_queued)
+
+    def add_queued(self):
+        """Insert the queued windows (if any) at once."""
+        if self._queue_handle is not None:
+            self._queue_handle.cancel()
+            self._queue_handle = None
+        clients, self._queued = self._queued, []
+        if not clients:
+            return False
+        self.unzoom()
+        new = []
+        for client in clients:
+            node = self._nodes[client] = self.node_class(client)
+            try:
+                self.root.restore(node)
+            except NotRestorableError:
+                new.append(node)
+        if new:
+            # New windows are added as siblings of the window which was
+            # focused when the first one was queued
+            anchor = self._queue_anchor
+            if anchor is None or anchor.is_root or anchor not in self.root:
+                self.root.add_children(new)
+            else:
+                anchor.parent.add_children(new, idx=anchor.index + 1)
+        self._queue_anchor = None
+        return True
+
+    def insert_queued(self):
+        self._queue_handle = None
+        if self.add_queued():
+            self.refocus()
+
     def remove(self, client):
-        self.root.find_payload(client).remove()
+        self.events.emit('remove', client)
+        self.hidden.discard(client)
+        if client in self._queued:
+            self._queued.remove(client)
+            return
+        self.find_node(client).remove()
+        self._nodes.pop(client, None)
+
+    def layout(self, windows, screen_rect):
+        Layout.layout(self, windows, screen_rect)
+        if self.events.subscribers:
+            self.events.flush(self.leaf_rects())
+
+    def leaf_rects(self):
+        """Return the int rects (x, y, width, height) of all visible windows
+        by window.
+        """
+        self.geometry(self.root)
+        return {geo.node.payload: tuple(pixel_perfect(geo.x, geo.y, geo.width,
+                                                      geo.height))
+                for geo in self._geometry.values()
+                if not geo.node and geo.node.payload is not None}
+
+    def geometry(self, node):
+        """Return the geometry of `node` (or None if it's hidden).
+
+        The geometry of all visible nodes is computed in a single pass and
+        cached until the tree changes. While zoomed, only the zoomed subtree
+        is laid out.
+        """
+        root = self.root
+        if self.zoomed is not None and self.zoomed not in root:
+            self.unzoom()
+        key = (root, root.version, self.zoomed)
+        if key != self._geometry_key:
+            with trace.span('geometry', 'geometry'):
+                if self.zoomed is None:
+                    geometry = root.geometry()
+                else:
+                    geometry = self.zoomed.geometry(
+                        (root.x, root.y, root.width, root.height))
+                self._geometry = {geo.node: geo for geo in geometry}
+            self._geometry_key = key
+        return self._geometry.get(node)
+
+    def zoom(self, node):
+        """Let `node` take the full area, hiding all other windows."""
+        if self.zoomed is None:
+            self._unzoomed_geometry = (self._geometry_key, self._geometry)
+        self.zoomed = None if node.is_root else node
+
+    def unzoom(self):
+        if self.zoomed is None:
+            return
+        self.zoomed = None
+        # The tree isn't changed by zooming, so unless it was changed in the
+        # meantime, the previous geometry is still valid
+        self._geometry_key, self._geometry = self._unzoomed_geometry
+        self._unzoomed_geometry = None
+
+    def update_screen(self, rect):
+        """Adapt the tree to the screen dimensions, if they changed."""
+        root = self.root
+        if (root.x, root.y) != (rect.x, rect.y):
+            root.x = rect.x
+            root.y = rect.y
+        if (root.width, root.height) != (rect.width, rect.height):
+            root.rescale(rect.width, rect.height)
 
     def configure(self, client, screen_rect):
-        self.root.x = screen_rect.x
-        self.root.y = screen_rect.y
-        self.root.width = screen_rect.width
-        self.root.height = screen_rect.height
-        node = self.root.find_payload(client)
-        border_width = self.border_width_single if self.root.tree == [node] \
-            else self.border_width
+        self.update_screen(screen_rect)
+        node = None if client in self._queued else self.find_node(client)
+        geo = None if node is None else self.geometry(node)
+        if geo is None:
+            if client not in self.hidden:
+                client.hide()
+                self.hidden.add(client)
+            return
+        self.hidden.discard(client)
+        border_width = self.border_width_single if \
+            self.root.children == [node] or node is self.zoomed else \
+            self.border_width
         border_color = getattr(self, 'border_' +
                                ('focus' if client.has_focus else 'normal') +
-                               ('' if node.flexible else '_fixed'))
-        x, y, width, height = node.pixel_perfect
-        client.place(
-            x,
-            y,
-            width-2*border_width,
-            height-2*border_width,
-            border_width,
-            border_color,
-            margin=self.margin,
-        )
+                               ('' if geo.flexible else '_fixed'))
+        x, y, width, height = pixel_perfect(geo.x, geo.y, geo.width,
+                                            geo.height)
+        with trace.span('place', 'x11'):
+            client.place(
+                x,
+                y,
+                width-2*border_width,
+                height-2*border_width,
+                border_width,
+                border_color,
+                margin=self.margin,
+            )
         # Always keep tiles below floating windows
         client.window.configure(stackmode=StackMode.Below)
         client.unhide()
 
     def focus(self, client):
+        # The group is laid out after focusing, which covers any scheduled
+        # refocus
+        self.cancel_refocus()
+        if client is not self.focused:
+            self.events.emit('focus', client)
         self.focused = client
-        self.root.find_payload(client).access()
+        if client in self._queued:
+            # The window is accessed when it's inserted
+            return
+        node = self.find_node(client)
+        if self.zoomed is not None and node not in self.zoomed:
+            self.unzoom()
+        node.unminimize()
+        node.access()
+
+    def visible_leafs(self, reverse=False):
+        """Return the leafs which aren't minimized, in tree order."""
+        leafs = [n for n in self.root.all_leafs if not n.minimized]
+        return leafs[::-1] if reverse else leafs
 
     def focus_first(self):
-        return self.root.first_leaf.payload
+        return next((n.payload for n in self.visible_leafs()), None)
 
     def focus_last(self):
-        return self.root.last_leaf.payload
+        return next((n.payload for n in self.visible_leafs(reverse=True)),
+                    None)
 
     def focus_next(self, win):
-        next_leaf = self.root.find_payload(win).next_leaf
-        return None if next_leaf is self.root.first_leaf else next_leaf.payload
+        self.add_queued()
+        first = self.root.first_leaf
+        next_leaf = self.find_node(win).next_leaf
+        while next_leaf.minimized and next_leaf is not first:
+            next_leaf = next_leaf.next_leaf
+        return None if next_leaf is first else next_leaf.payload
 
     def focus_previous(self, win):
-        prev_leaf = self.root.find_payload(win).prev_leaf
-        return None if prev_leaf is self.root.last_leaf else prev_leaf.payload
+        self.add_queued()
+        last = self.root.last_leaf
+        prev_leaf = self.find_node(win).prev_leaf
+        while prev_leaf.minimized and prev_leaf is not last:
+            prev_leaf = prev_leaf.prev_leaf
+        return None if prev_leaf is last else prev_leaf.payload
 
     def focus_node(self, node):
         if node is None:
             return
+        if self._batch_depth:
+            # Only track the focus, the group is focused after the batch
+            self.focus(node.payload)
+            return
         self.group.focus(node.payload)
 
     def refocus(self):
+        if self._batch_depth:
+            return
         self.group.focus(self.focused)
 
+    def refocus_later(self):
+        """Refocus once the frame interval passed, so the relayouts of
+        rapidly repeated commands are coalesced into one.
+
+        (The tree itself is changed immediately and stays consistent.)
+        """
+        if not self.resize_frame_interval or self._batch_depth:
+            self.refocus()
+            return
+        if self._refocus_handle is None:
+            self._refocus_handle = self.group.qtile.call_later(
+                self.resize_frame_interval, self._scheduled_refocus)
+
+    def cancel_refocus(self):
+        if self._refocus_handle is not None:
+            self._refocus_handle.cancel()
+            self._refocus_handle = None
+
+    def _scheduled_refocus(self):
+        self._refocus_handle = None
+        self.refocus()
+
+    def cmd_batch(self, ops):
+        """Apply a list of commands, relayouting only once at the end.
+
+        Each command is given by its name or as a list of its name and
+        arguments, e.g. `['integrate_left', ['width', 300]]`.
+        """
+        calls = []
+        for op in ops:
+            name, *args = [op] if isinstance(op, str) else op
+            method = getattr(self, 'cmd_' + name, None)
+            if method is None:
+                raise ValueError('Unknown command: %s' % name)
+            calls.append((method, args))
+        self._batch_depth += 1
+        try:
+            for method, args in calls:
+                method(*args)
+        finally:
+            # Also lay out the commands applied before a failing one
+            self._batch_depth -= 1
+            self.refocus()
+
+    def cmd_info_since(self, version):
+        """Return 'unchanged' if the info didn't change since `version` (as
+        returned in the info), else the changes.
+
+        (The changes hold the new version, the changed info fields and, if the
+        tree changed, the changed subtrees in `tree_changes` (see
+        `tree_changes()`). If `version` is too old, the full info is
+        returned.)
+        """
+        info = self.info()
+        current = info.pop('version')
+        if version == current:
+            return 'unchanged'
+        old = self._infos.get(version)
+        if old is None:
+            return dict(info, version=current)
+        changes = {k: v for k, v in info.items()
+                   if k != 'tree' and old.get(k) != v}
+        changes['version'] = current
+        tree_changes = self.tree_changes(old['tree'], info['tree'])
+        if tree_changes:
+            changes['tree_changes'] = tree_changes
+        return changes
+
+    def cmd_geometry(self):
+        """Return the id, name, rect (x, y, width, height), fixed flag, focus
+        state and tree path (child indices from the root) of each window.
+
+        (The rect of a hidden window is None.)
+        """
+        windows = []
+        stack = [(self.root, [])]
+        while stack:
+            node, path = stack.pop()
+            if node:
+                stack.extend((child, path + [i]) for i, child in
+                             reversed(list(enumerate(node))))
+                continue
+            if node.payload is None:
+                # Empty root
+                continue
+            geo = self.geometry(node)
+            windows.append({
+                'id': node.payload.wid,
+                'name': node.payload.name,
+                'rect': None if geo is None else list(pixel_perfect(
+                    geo.x, geo.y, geo.width, geo.height)),
+                'fixed': node.fixed,
+                'focused': node.payload is self.focused,
+                'path': path,
+            })
+        return windows
+
     def cmd_next(self):
         """Focus next window."""
-        self.focus_node(self.focused_node.next_leaf)
+        node = self.focused_node.next_leaf
+        while node.minimized and node is not self.focused_node:
+            node = node.next_leaf
+        self.focus_node(node)
 
     def cmd_previous(self):
         """Focus previous window."""
-        self.focus_node(self.focused_node.prev_leaf)
+        node = self.focused_node.prev_leaf
+        while node.minimized and node is not self.focused_node:
+            node = node.prev_leaf
+        self.focus_node(node)
 
     def cmd_recent(self):
         """Focus most recently focused window.
 
         (Toggles between the two latest active windows.)
         """
-        nodes = [n for n in self.root.all_leafs if n is not self.focused_node]
-        most_recent = max(nodes, key=lambda n: n.last_accessed)
+        nodes = [n for n in self.visible_leafs() if n is not self.focused_node]
+        most_recent = max(nodes, key=lambda n: n.last_accessed, default=None)
         self.focus_node(most_recent)
 
     def cmd_left(self):
@@ -156,46 +575,129 @@ class Plasma(Layout):
         """Focus window below."""
         self.focus_node(self.focused_node.close_down)
 
+    def _after_move(self):
+        self.events.emit('move', self.focused)
+        self.refocus()
+
+    def _after_resize(self):
+        self.events.emit('resize', self.focused)
+        self.refocus_later()
+
     def cmd_move_left(self):
         """Move current window left."""
         self.focused_node.move_left()
-        self.refocus()
+        self._after_move()
 
     def cmd_move_right(self):
         """Move current window right."""
         self.focused_node.move_right()
-        self.refocus()
+        self._after_move()
 
     def cmd_move_up(self):
         """Move current window up."""
         self.focused_node.move_up()
-        self.refocus()
+        self._after_move()
 
     def cmd_move_down(self):
         """Move current window down."""
         self.focused_node.move_down()
-        self.refocus()
+        self._after_move()
 
     def cmd_integrate_left(self):
         """Integrate current window left."""
         self.focused_node.integrate_left()
-        self.refocus()
+        self._after_move()
 
     def cmd_integrate_right(self):
         """Integrate current window right."""
         self.focused_node.integrate_right()
-        self.refocus()
+        self._after_move()
 
     def cmd_integrate_up(self):
         """Integrate current window up."""
         self.focused_node.integrate_up()
-        self.refocus()
+        self._after_move()
 
     def cmd_integrate_down(self):
         """Integrate current window down."""
         self.focused_node.integrate_down()
+        self._after_move()
+
+    def cmd_normalize(self):
+        """Flatten redundant containers in the whole tree."""
+        self.root.normalize()
+        self.refocus()
+
+    def set_container_mode(self, mode):
+        self.focused_node.parent.container_mode = mode
         self.refocus()
 
+    def cmd_layout_split(self):
+        """Show all windows of the current container side by side."""
+        self.set_container_mode(ContainerMode.SPLIT)
+
+    def cmd_layout_tabbed(self):
+        """Show only the focused window of the current container, using the
+        container's full area (tabbed).
+
+        (The windows are switched with `left` and `right`.)
+        """
+        self.set_container_mode(ContainerMode.TABBED)
+
+    def cmd_layout_stacked(self):
+        """Show only the focused window of the current container, using the
+        container's full area (stacked).
+
+        (The windows are switched with `up` and `down`.)
+        """
+        self.set_container_mode(ContainerMode.STACKED)
+
+    def cmd_zoom(self):
+        """Toggle showing the current window in the full area."""
+        if self.zoomed is not None:
+            self.unzoom()
+        else:
+            self.zoom(self.focused_node)
+        self.refocus()
+
+    def cmd_zoom_container(self):
+        """Toggle showing the container of the current window in the full
+        area.
+
+        (If the current window is already zoomed in, its container is zoomed
+        in instead.)
+        """
+        node = self.focused_node.parent
+        if self.zoomed is self.focused_node:
+            self.zoom(node)
+        elif self.zoomed is not None:
+            self.unzoom()
+        else:
+            self.zoom(node)
+        self.refocus()
+
+    def cmd_minimize(self):
+        """Minimize the current window, keeping its place in the layout, and
+        focus the most recent other window.
+
+        (The window is restored when it gets focused again.)
+        """
+        node = self.focused_node
+        others = [n for n in self.visible_leafs() if n is not node]
+        if not others:
+            # Nothing would be left to focus
+            return
+        if self.zoomed is not None and node in self.zoomed:
+            self.unzoom()
+        node.minimize()
+        self.focus_node(max(others, key=lambda n: n.last_accessed))
+
+    def cmd_unminimize(self):
+        """Restore and focus the most recently minimized window."""
+        nodes = [n for n in self.root.all_leafs if n.minimized]
+        most_recent = max(nodes, key=lambda n: n.last_accessed, default=None)
+        self.focus_node(most_recent)
+
     def cmd_mode_horizontal(self):
         """Next window will be added horizontally."""
         self.add_mode = AddMode.HORIZONTAL
@@ -222,22 +724,22 @@ class Plasma(Layout):
         (It's recommended to use `width()`/`height()` instead.)
         """
         self.focused_node.size = x
-        self.refocus()
+        self._after_resize()
 
     def cmd_width(self, x):
         """Set width of current window."""
         self.focused_node.width = x
-        self.refocus()
+        self._after_resize()
 
     def cmd_height(self, x):
         """Set height of current window."""
         self.focused_node.height = x
-        self.refocus()
+        self._after_resize()
 
     def cmd_reset_size(self):
         """Reset size of current window to automatic (relative) sizing."""
         self.focused_node.reset_size()
-        self.refocus()
+        self._after_resize()
 
     def cmd_grow(self, x):
         """Grow size of current window.
@@ -245,14 +747,76 @@ class Plasma(Layout):
         (It's recommended to use `grow_width()`/`grow_height()` instead.)
         """
         self.focused_node.size += x
-        self.refocus()
+        self._after_resize()
 
     def cmd_grow_width(self, x):
         """Grow width of current window."""
         self.focused_node.width += x
-        self.refocus()
+        self._after_resize()
 
     def cmd_grow_height(self, x):
         """Grow height of current window."""
         self.focused_node.height += x
-        self.refocus()
+        self._after_resize()
+
+    def cmd_drag_boundary(self, direction, delta):
+        """Move the edge of the current window in `direction` ('left',
+        'right', 'up' or 'down') by `delta` pixels, resizing only the window
+        on the other side of the edge.
+
+        (Suited for continuous resizing, e.g. when dragging with the mouse.)
+        """
+        if self.focused_node.move_boundary(Direction[direction.upper()],
+                                           delta):
+            self._after_resize()
+
+    def cmd_latencies(self):
+        """Return latency statistics (count, p50/p95/p99/max in ms) of the
+        layout's commands and window operations.
+        """
+        if self.latencies is None:
+            return {}
+        return self.latencies.summary()
+
+    def cmd_reset_latencies(self):
+        """Reset latency statistics."""
+        if self.latencies is not None:
+            self.latencies.reset()
+
+    def cmd_start_trace(self, path):
+        """Start recording a trace of layout operations to the file `path`.
+
+        (The file uses Chrome's trace-event format.)
+        """
+        self._tracer = trace.start(path)
+
+    def cmd_stop_trace(self):
+        """Stop recording the trace and flush it to the file."""
+        trace.stop()
+
+    def cmd_profile(self, seconds, path, pattern='plasma/'):
+        """Profile the running layout for `seconds` and write the stats to
+        the file `path`.
+
+        (Only frames from files matching `pattern` are kept. Pass an empty
+        pattern to keep all frames.)
+        """
+        profiling.start()
+        self.group.qtile.call_later(seconds, profiling.stop, path, pattern)
+
+    def cmd_start_recording(self, path):
+        """Start recording all layout operations to the file `path`.
+
+        (The recording can be replayed headless with `plasma.replay`.)
+        """
+        self.cmd_stop_recording()
+        # Insert queued windows first, so they're part of the recorded tree
+        if self._queued:
+            self.insert_queued()
+        self.recorder = Recorder(path, self)
+
+    def cmd_stop_recording(self):
+        """Stop recording layout operations."""
+        if self.recorder is not None:
+            self.recorder.flush()
+            self.recorder = None
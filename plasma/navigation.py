@@ -0,0 +1,123 @@
+"""Finding the neighbors of nodes, either in the tree or on the screen."""
+
+from collections import namedtuple
+from math import isclose
+
+from .sizing import FLIPPED, VERTICAL
+
+
+Box = namedtuple('Box', 'node x y x_end y_end')
+
+def edges_meet(node, a, b):
+    """Return whether the edge coordinates `a` and `b` in the tree of `node`
+    are the same.
+    """
+    return a == b if node.exact else isclose(a, b)
+
+def common_border(node, other, direction):
+    """Return whether `node` and `other` have a common border in
+    `direction`.
+    """
+    if not edges_meet(node, getattr(node, direction.edge),
+                      getattr(other, direction.opposite_edge)):
+        return False
+    if direction.orient is VERTICAL:
+        detached = other.x >= node.x_end or other.x_end <= node.x
+    else:
+        detached = other.y >= node.y_end or other.y_end <= node.y
+    return not detached
+
+def _sibling(node, direction):
+    """Return the nearest sibling of `node` in `direction` which isn't
+    minimized.
+    """
+    parent = node.parent
+    idx = node.index + direction.offset
+    while 0 <= idx < len(parent) and parent[idx].minimized:
+        idx += direction.offset
+    return parent[idx] if 0 <= idx < len(parent) else None
+
+def neighbor(node, direction):
+    """Return the adjacent leaf node of `node` in `direction`."""
+    if node.is_root:
+        return None
+    orient = node.parent.orient
+    while not node.is_root:
+        parent = node.parent
+        if direction.orient is orient:
+            sibling = _sibling(node, direction)
+            if sibling is not None:
+                return sibling.recent_leaf
+            if parent.is_root:
+                return None
+            # Two levels up, the orientation is the same again
+            node = parent.parent
+        else:
+            node = parent
+            orient = FLIPPED[orient]
+    return None
+
+def tab_neighbor(node, direction):
+    """Return the leaf node of the next hidden child in `direction` of the
+    nearest tabbed or stacked container around `node`.
+
+    None is returned if there is a visible neighbor in `direction` inside
+    that container, or if there is no such container (or sibling).
+    """
+    if node.is_root:
+        return None
+    orient = node.parent.orient
+    while not node.is_root:
+        parent = node.parent
+        split = parent.split
+        if (orient if split else parent.container_mode.orient) is \
+                direction.orient:
+            sibling = _sibling(node, direction)
+            if sibling is not None:
+                return None if split else sibling.recent_leaf
+        node = parent
+        orient = FLIPPED[orient]
+    return None
+
+def close_neighbor(node, direction):
+    """Return the visually adjacent leaf node of `node` in `direction`.
+
+    Inside tabbed and stacked containers, the neighbors are the containers'
+    other children (see `tab_neighbor()`).
+    """
+    tab = tab_neighbor(node, direction)
+    if tab is not None:
+        return tab
+    # Take all coordinates from a single geometry pass instead of evaluating
+    # the coordinate properties for each leaf
+    own = None
+    leafs = []
+    for geo in node.root.geometry():
+        box = Box(geo.node, geo.x, geo.y, geo.x + geo.width,
+                  geo.y + geo.height)
+        if geo.node is node:
+            own = box
+        if not geo.node:
+            leafs.append(box)
+    if own is None:
+        # The node is hidden
+        return None
+    edge = getattr(own, direction.edge)
+    if direction.orient is VERTICAL:
+        touching = lambda b: not (b.x >= own.x_end or b.x_end <= own.x)
+    else:
+        touching = lambda b: not (b.y >= own.y_end or b.y_end <= own.y)
+    boxes = [b for b in leafs if touching(b) and
+             edges_meet(node, edge, getattr(b, direction.opposite_edge))]
+    if not boxes:
+        return None
+    most_recent = max(boxes, key=lambda b: b.node.last_accessed)
+    if most_recent.node.last_accessed > 0:
+        return most_recent.node
+    if direction.orient is VERTICAL:
+        center = (own.x + own.x_end) / 2
+        match = lambda b: b.x <= center <= b.x_end
+    else:
+        center = (own.y + own.y_end) / 2
+        match = lambda b: b.y <= center <= b.y_end
+    return next(b.node for b in boxes if match(b))
@@ -1,37 +1,27 @@
 from collections import namedtuple
+from enum import Enum, Flag, auto
 import time
 from math import isclose
-import sys
-
-if sys.version_info >= (3, 6):
-    from enum import Enum, Flag, auto
-else:
-    # Python 3.5 backport
-    from .enum import Enum, Flag, auto
 
+from . import navigation, sizing
+from .sizing import FLIPPED, HORIZONTAL, VERTICAL, Dimensions, pixel_perfect
+from .trace import traced
 
 Point = namedtuple('Point', 'x y')
-Dimensions = namedtuple('Dimensions', 'x y width height')
-
-class Orient(Flag):
-    HORIZONTAL = 0
-    VERTICAL = 1
-
-HORIZONTAL, VERTICAL = Orient
 
 class Direction(Enum):
-    UP = auto()
-    DOWN = auto()
-    LEFT = auto()
-    RIGHT = auto()
-
-    @property
-    def orient(self):
-        return HORIZONTAL if self in [self.LEFT, self.RIGHT] else VERTICAL
-
-    @property
-    def offset(self):
-        return 1 if self in [self.RIGHT, self.DOWN] else -1
+    # Each direction is described by its orientation, its index offset and
+    # the node edges that touch in a common border.
+    UP = (VERTICAL, -1, 'y', 'y_end')
+    DOWN = (VERTICAL, 1, 'y_end', 'y')
+    LEFT = (HORIZONTAL, -1, 'x', 'x_end')
+    RIGHT = (HORIZONTAL, 1, 'x_end', 'x')
+
+    def __init__(self, orient, offset, edge, opposite_edge):
+        self.orient = orient
+        self.offset = offset
+        self.edge = edge
+        self.opposite_edge = opposite_edge
 
 UP, DOWN, LEFT, RIGHT = Direction
 
@@ -42,14 +32,29 @@ class AddMode(Flag):
 
     @property
     def orient(self):
-        return VERTICAL if self & self.VERTICAL else HORIZONTAL
+        return VERTICAL if self & AddMode.VERTICAL else HORIZONTAL
+
+class ContainerMode(Enum):
+    # Children are aligned side by side
+    SPLIT = auto()
+    # Only the active child is shown, using the container's full area (tabbed
+    # and stacked containers only differ in how a decoration would list the
+    # children)
+    TABBED = auto()
+    STACKED = auto()
+
+    @property
+    def orient(self):
+        """Return the orientation in which a decoration would list the
+        children (which is also the one for switching between them).
+        """
+        return VERTICAL if self is ContainerMode.STACKED else HORIZONTAL
 
-border_check = {
-    UP: lambda a, b: isclose(a.y, b.y_end),
-    DOWN: lambda a, b: isclose(a.y_end, b.y),
-    LEFT: lambda a, b: isclose(a.x, b.x_end),
-    RIGHT: lambda a, b: isclose(a.x_end, b.x),
-}
+def _border_check(direction):
+    edge, opposite_edge = direction.edge, direction.opposite_edge
+    return lambda a, b: isclose(getattr(a, edge), getattr(b, opposite_edge))
+
+border_check = {d: _border_check(d) for d in Direction}
 
 class NotRestorableError(Exception):
     pass
@@ -61,6 +66,11 @@ class Node:
     """
     min_size_default = 100
     root_orient = HORIZONTAL
+    # Compute all sizes in integer pixels, so edges line up exactly (the root
+    # dimensions have to be ints, too)
+    exact = False
+    # Fixed sizes are stored relative to the root dimensions
+    proportional = False
 
     def __init__(self, payload=None, x=None, y=None, width=None, height=None):
         self.payload = payload
@@ -73,6 +83,12 @@ class Node:
         self.last_accessed = 0
         self.parent = None
         self.restorables = {}
+        self._container_mode = ContainerMode.SPLIT
+        # A minimized node keeps its place in the tree but takes no space
+        self.minimized = False
+        # Incremented on each change of the tree's geometry (only maintained
+        # on the root)
+        self.version = 0
 
     def __repr__(self):
         info = self.payload or ''
@@ -81,12 +97,14 @@ class Node:
         return '<Node %s %x>' % (info, id(self))
 
     def __contains__(self, node):
-        if node is self:
-            return True
-        for child in self:
-            if node in child:
-                return True
-        return False
+        # Walk up from the node, verifying each link, since detached nodes
+        # still reference their former parent
+        while node is not self:
+            parent = node.parent
+            if parent is None or node not in parent.children:
+                return False
+            node = parent
+        return True
 
     def __iter__(self):
         yield from self.children
@@ -102,10 +120,13 @@ class Node:
 
     @property
     def root(self):
-        try:
-            return self.parent.root
-        except AttributeError:
-            return self
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def _changed(self):
+        self.root.version += 1
 
     @property
     def is_root(self):
@@ -121,7 +142,18 @@ class Node:
 
     @property
     def tree(self):
-        return [c.tree if c else c for c in self]
+        tree = []
+        stack = [(self, tree)]
+        while stack:
+            node, items = stack.pop()
+            for child in node:
+                if child:
+                    subtree = []
+                    stack.append((child, subtree))
+                    items.append(subtree)
+                else:
+                    items.append(child)
+        return tree
 
     @property
     def siblings(self):
@@ -129,52 +161,83 @@ class Node:
 
     @property
     def first_leaf(self):
-        if self.is_leaf:
-            return self
-        return self[0].first_leaf
+        node = self
+        while node:
+            node = node[0]
+        return node
 
     @property
     def last_leaf(self):
-        if self.is_leaf:
-            return self
-        return self[-1].last_leaf
+        node = self
+        while node:
+            node = node[-1]
+        return node
 
     @property
     def recent_leaf(self):
-        if self.is_leaf:
-            return self
-        return max(self, key=lambda n: n.last_accessed).recent_leaf
+        node = self
+        while node:
+            # Prefer nodes which aren't minimized
+            node = max(node, key=lambda n: (not n.minimized, n.last_accessed))
+        return node
 
     @property
     def prev_leaf(self):
-        if self.is_root:
-            return self.last_leaf
-        idx = self.index - 1
-        if idx < 0:
-            return self.parent.prev_leaf
-        return self.parent[idx].last_leaf
+        node = self
+        while not node.is_root:
+            idx = node.index - 1
+            if idx >= 0:
+                return node.parent[idx].last_leaf
+            node = node.parent
+        return node.last_leaf
 
     @property
     def next_leaf(self):
-        if self.is_root:
-            return self.first_leaf
-        idx = self.index + 1
-        if idx >= len(self.parent):
-            return self.parent.next_leaf
-        return self.parent[idx].first_leaf
+        node = self
+        while not node.is_root:
+            idx = node.index + 1
+            if idx < len(node.parent):
+                return node.parent[idx].first_leaf
+            node = node.parent
+        return node.first_leaf
 
     @property
     def all_leafs(self):
-        if self.is_leaf:
-            yield self
-        for child in self:
-            yield from child.all_leafs
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf:
+                yield node
+            stack.extend(reversed(node.children))
+
+    @property
+    def container_mode(self):
+        return self._container_mode
+
+    @container_mode.setter
+    def container_mode(self, mode):
+        self._container_mode = mode
+        self._changed()
+
+    @property
+    def split(self):
+        """Whether all children are shown side by side."""
+        return self._container_mode is ContainerMode.SPLIT
+
+    @property
+    def active_child(self):
+        """Return the child shown by a tabbed or stacked container."""
+        return max((c for c in self if not c.minimized),
+                   key=lambda n: n.last_accessed, default=None)
 
     @property
     def orient(self):
-        if self.is_root:
-            return self.root_orient
-        return ~self.parent.orient
+        node = self
+        flipped = False
+        while node.parent is not None:
+            node = node.parent
+            flipped = not flipped
+        return FLIPPED[node.root_orient] if flipped else node.root_orient
 
     @property
     def horizontal(self):
@@ -188,46 +251,56 @@ class Node:
     def x(self):
         if self.is_root:
             return self._x
-        if self.horizontal:
-            return self.parent.x
-        return self.parent.x + self.size_offset
+        return sizing.position(self, True)
 
     @x.setter
     def x(self, val):
         if not self.is_root:
             return
         self._x = val
+        self._changed()
 
     @property
     def y(self):
         if self.is_root:
             return self._y
-        if self.vertical:
-            return self.parent.y
-        return self.parent.y + self.size_offset
+        return sizing.position(self, False)
 
     @y.setter
     def y(self, val):
         if not self.is_root:
             return
         self._y = val
+        self._changed()
 
     @property
     def pos(self):
         return Point(self.x, self.y)
 
+    def _dimension(self, horizontal):
+        """Return the width (if `horizontal`) or height."""
+        # The dimension is inherited from the parent unless it's the one the
+        # node is sized in
+        node = self
+        node_horizontal = self.orient is HORIZONTAL
+        while not node.is_root and node_horizontal is horizontal:
+            node = node.parent
+            node_horizontal = not node_horizontal
+        if node.is_root:
+            return node.width if horizontal else node.height
+        return node.size
+
     @property
     def width(self):
         if self.is_root:
             return self._width
-        if self.horizontal:
-            return self.parent.width
-        return self.size
+        return self._dimension(True)
 
     @width.setter
     def width(self, val):
         if self.is_root:
             self._width = val
+            self._changed()
         elif self.horizontal:
             self.parent.size = val
         else:
@@ -237,14 +310,13 @@ class Node:
     def height(self):
         if self.is_root:
             return self._height
-        if self.vertical:
-            return self.parent.height
-        return self.size
+        return self._dimension(False)
 
     @height.setter
     def height(self, val):
         if self.is_root:
             self._height = val
+            self._changed()
         elif self.vertical:
             self.parent.size = val
         else:
@@ -291,86 +363,148 @@ class Node:
         """Return pixel-perfect int dimensions (x, y, width, height) which
         compensate for gaps in the layout grid caused by plain int conversion.
         """
-        x, y, width, height = self.x, self.y, self.width, self.height
-        threshold = 0.99999
-        if (x - int(x)) + (width - int(width)) > threshold:
-            width += 1
-        if (y - int(y)) + (height - int(height)) > threshold:
-            height += 1
-        return Dimensions(*map(int, (x, y, width, height)))
+        if self.exact:
+            return Dimensions(self.x, self.y, self.width, self.height)
+        return pixel_perfect(self.x, self.y, self.width, self.height)
 
     @property
     def capacity(self):
-        return self.width if self.horizontal else self.height
-
-    @property
-    def size(self):
-        """Return amount of space taken in parent container."""
         if self.is_root:
-            return None
+            return self._width if self.horizontal else self._height
+        # A node spans its parent fully in the direction of its own
+        # orientation, which is the one the parent is sized in
+        parent = self.parent
+        if parent.is_root:
+            return parent.width if self.horizontal else parent.height
+        return parent.size
+
+    def _needs_capacity(self):
+        if self.minimized:
+            return False
+        return not self.parent.split or self.flexible
+
+    def _size_in(self, capacity):
+        """Return the size, given the capacity of the parent (which is only
+        needed if the node is flexible or not split from its siblings).
+        """
+        if self.minimized:
+            return 0
+        if not self.parent.split:
+            return capacity
         if self.fixed:
             return self._size
         if self.flexible:
             # Distribute space evenly among flexible nodes
             taken = sum(n.size for n in self.siblings if not n.flexible)
             flexibles = [n for n in self.parent if n.flexible]
-            return (self.parent.capacity - taken) / len(flexibles)
+            space = capacity - taken
+            if self.exact:
+                share, rest = divmod(space, len(flexibles))
+                return share + (1 if flexibles.index(self) < rest else 0)
+            return space / len(flexibles)
         return max(sum(gc.min_size for gc in c) for c in self)
 
+    @property
+    def size(self):
+        """Return amount of space taken in parent container."""
+        if self.is_root:
+            return None
+        # The size of a flexible node depends on the capacity of its parent,
+        # which is the size of its grandparent. Collect the chain of
+        # grandparents up to a size that can be determined directly and
+        # resolve it top-down.
+        chain = [self]
+        node = self
+        while node._needs_capacity():  # pylint: disable=protected-access
+            grandparent = node.parent.parent
+            if grandparent is None or grandparent.is_root:
+                break
+            node = grandparent
+            chain.append(node)
+        top = chain.pop()
+        size = top._size_in(top.parent.capacity if top._needs_capacity()
+                            else None)
+        for node in reversed(chain):
+            size = node._size_in(size)  # pylint: disable=protected-access
+        return size
+
     @size.setter
     def size(self, val):
-        if self.is_root or not self.siblings:
+        if self.is_root or not self.siblings or not self.parent.split:
             return
         if val is None:
             self.reset_size()
             return
+        if self.exact:
+            val = round(val)
         occupied = sum(s.min_size_bound for s in self.siblings)
         val = max(min(val, self.parent.capacity - occupied),
                   self.min_size_bound)
         self.force_size(val)
 
+    @traced('mutation')
     def force_size(self, val):
         """Set size without considering available space."""
         Node.fit_into(self.siblings, self.parent.capacity - val)
+        self._changed()
         if val == 0:
             return
         if self:
             Node.fit_into([self], val)
         self._size = val
 
+    @traced('mutation')
+    def move_boundary(self, direction, delta):
+        """Move the edge in `direction` by `delta` (growing the node if
+        positive). Return whether the edge was moved.
+
+        The edge is the one of the nearest ancestor (or the node itself) with
+        a neighbor in `direction`. Only the two nodes sharing the edge are
+        resized, all other nodes keep their size.
+        """
+        node = self
+        while not node.is_root:
+            parent = node.parent
+            if parent.split and direction.orient is parent.orient:
+                idx = node.index + direction.offset
+                while 0 <= idx < len(parent) and parent[idx].minimized:
+                    idx += direction.offset
+                if 0 <= idx < len(parent):
+                    return node._transfer_space(  # pylint: disable=W0212
+                        parent[idx], delta)
+            node = parent
+        return False
+
+    def _transfer_space(self, other, delta):
+        """Take `delta` of space from the sibling `other`."""
+        size, other_size = self.size, other.size
+        delta = max(min(delta, other_size - other.min_size_bound),
+                    self.min_size_bound - size)
+        if self.exact:
+            delta = round(delta)
+        if not delta:
+            return False
+        # Both nodes become fixed. As their total size stays the same, this
+        # doesn't change the share of any flexible sibling.
+        new_sizes = ((self, size + delta), (other, other_size - delta))
+        for node, new_size in new_sizes:
+            if node:
+                Node.fit_into([node], new_size)
+            node._size = new_size  # pylint: disable=protected-access
+        self._changed()
+        return True
+
     @property
     def size_offset(self):
+        if not self.parent.split:
+            return 0
         return sum(c.size for c in self.parent[:self.index])
 
     @staticmethod
+    @traced('fit_into')
     def fit_into(nodes, space):
         """Resize nodes to fit them into the available space."""
-        if not nodes:
-            return
-        occupied = sum(n.min_size for n in nodes)
-        if space >= occupied and any(n.flexible for n in nodes):
-            # If any flexible node exists, it will occupy the space
-            # automatically, not requiring any action.
-            return
-        nodes_left = nodes[:]
-        space_left = space
-        if space < occupied:
-            for node in nodes:
-                if node.min_size_bound != node.min_size:
-                    continue
-                # Substract nodes that are already at their minimal possible
-                # size because they can't be shrinked any further.
-                space_left -= node.min_size
-                nodes_left.remove(node)
-        if not nodes_left:
-            return
-        factor = space_left / sum(n.size for n in nodes_left)
-        for node in nodes_left:
-            new_size = node.size * factor
-            if node.fixed:
-                node._size = new_size  # pylint: disable=protected-access
-            for child in node:
-                Node.fit_into(child, new_size)
+        sizing.run(sizing.fit_into(nodes, space))
 
     @property
     def fixed(self):
@@ -379,51 +513,72 @@ class Node:
 
     @property
     def min_size(self):
+        if self.minimized:
+            return 0
         if self.fixed:
             return self._size
         if self.is_leaf:
             return self.min_size_default
-        size = max(sum(gc.min_size for gc in c) for c in self)
-        return max(size, self.min_size_default)
+        return sizing.run(sizing.min_size(self))
 
     @property
     def min_size_bound(self):
+        if self.minimized:
+            return 0
         if self.is_leaf:
             return self.min_size_default
-        return max(sum(gc.min_size_bound for gc in c) or
-                   self.min_size_default for c in self)
+        return sizing.run(sizing.min_size_bound(self))
 
     def reset_size(self):
         self._size = None
+        self._changed()
+
+    @traced('mutation')
+    def rescale(self, width, height):
+        """Set the dimensions of the root, scaling all fixed sizes in the tree
+        proportionally.
+        """
+        factors = {
+            HORIZONTAL: width / self.width if self.width else 1,
+            VERTICAL: height / self.height if self.height else 1,
+        }
+        self.width = width
+        self.height = height
+        if self.proportional:
+            # Relative sizes scale along by themselves
+            return
+        sizing.scale(self, factors)
 
     @property
     def flexible(self):
         """A node is flexible if its size isn't (explicitly or implictly)
         determined.
         """
-        if self.fixed:
+        if self.fixed or self.minimized:
             return False
-        return all((any(gc.flexible for gc in c) or c.is_leaf) for c in self)
+        if self.is_leaf:
+            return True
+        return sizing.run(sizing.flexible(self))
+
+    def geometry(self, rect=None):
+        """Yield the geometry of all nodes in the subtree (see `sizing`)."""
+        return sizing.geometry(self, rect)
 
     def access(self):
-        self.last_accessed = time.time()
-        try:
-            self.parent.access()
-        except AttributeError:
-            pass
+        now = time.time()
+        node = self
+        changed = False
+        while node is not None:
+            node.last_accessed = now
+            node = node.parent
+            # The active child of a tabbed or stacked container may change
+            changed = changed or (node is not None and not node.split)
+        if changed:
+            self._changed()
 
     def neighbor(self, direction):
         """Return adjacent leaf node in specified direction."""
-        if self.is_root:
-            return None
-        if direction.orient is self.parent.orient:
-            target_idx = self.index + direction.offset
-            if 0 <= target_idx < len(self.parent):
-                return self.parent[target_idx].recent_leaf
-            if self.parent.is_root:
-                return None
-            return self.parent.parent.neighbor(direction)
-        return self.parent.neighbor(direction)
+        return navigation.neighbor(self, direction)
 
     @property
     def up(self):
@@ -445,28 +600,11 @@ class Node:
         """Return whether a common border with given node in specified
         direction exists.
         """
-        if not border_check[direction](self, node):
-            return False
-        if direction in [UP, DOWN]:
-            detached = node.x >= self.x_end or node.x_end <= self.x
-        else:
-            detached = node.y >= self.y_end or node.y_end <= self.y
-        return not detached
+        return navigation.common_border(self, node, direction)
 
     def close_neighbor(self, direction):
         """Return visually adjacent leaf node in specified direction."""
-        nodes = [n for n in self.root.all_leafs if
-                 self.common_border(n, direction)]
-        if not nodes:
-            return None
-        most_recent = max(nodes, key=lambda n: n.last_accessed)
-        if most_recent.last_accessed > 0:
-            return most_recent
-        if direction in [UP, DOWN]:
-            match = lambda n: n.x <= self.x_center <= n.x_end
-        else:
-            match = lambda n: n.y <= self.y_center <= n.y_end
-        return next(n for n in nodes if match(n))
+        return navigation.close_neighbor(self, direction)
 
     @property
     def close_up(self):
@@ -484,49 +622,164 @@ class Node:
     def close_right(self):
         return self.close_neighbor(RIGHT)
 
+    @traced('mutation')
     def add_child(self, node, idx=None):
         if idx is None:
             idx = len(self)
+        if not node.minimized:
+            self.unminimize()
         self.children.insert(idx, node)
         node.parent = self
+        self._changed()
         if len(self) == 1:
             return
         total = self.capacity
-        Node.fit_into(node.siblings, total - (total / len(self)))
+        share = total // len(self) if self.exact else total / len(self)
+        Node.fit_into(node.siblings, total - share)
+
+    @traced('mutation')
+    def add_children(self, nodes, idx=None):
+        """Add several children at once, fitting the existing children into
+        the remaining space only once.
+        """
+        if idx is None:
+            idx = len(self)
+        self.unminimize()
+        old = self.children[:]
+        self.children[idx:idx] = nodes
+        for node in nodes:
+            node.parent = self
+        self._changed()
+        if not old:
+            return
+        total = self.capacity
+        # Like with single additions, each new child takes an even share
+        taken = total * len(nodes)
+        taken = taken // len(self) if self.exact else taken / len(self)
+        Node.fit_into(old, total - taken)
 
     def add_child_after(self, new, old):
         self.add_child(new, idx=old.index+1)
 
+    @traced('mutation')
     def remove_child(self, node):
+        # Restore the node with the size it had before being minimized
+        node.minimized = False
         node._save_restore_state()  # pylint: disable=W0212
         node.force_size(0)
         self.children.remove(node)
+        self._changed()
+        if self and all(c.minimized for c in self):
+            self.minimize()
         if len(self) == 1:
-            child = self[0]
             if self.is_root:
                 # A single child doesn't need a fixed size
-                child.reset_size()
+                self[0].reset_size()
             else:
-                # Collapse tree with a single child
-                self.parent.replace_child(self, child)
-                Node.fit_into(child, self.capacity)
+                self.collapse()
 
     def remove(self):
         self.parent.remove_child(self)
 
+    @traced('mutation')
+    def minimize(self):
+        """Shrink the node to zero size, keeping its place in the tree.
+
+        Unlike removing and restoring the node, this leaves the tree
+        structure and the node's own size untouched, so it's cheap to undo.
+        Containers whose children are all minimized are minimized as well.
+        """
+        if self.minimized or self.is_root:
+            return
+        node = self
+        node.minimized = True
+        while (not node.parent.is_root and
+               all(c.minimized for c in node.parent)):
+            node = node.parent
+            node.minimized = True
+        if node.parent.split:
+            # Let the siblings take over the space
+            Node.fit_into(node.siblings, node.parent.capacity)
+        self._changed()
+
+    @traced('mutation')
+    def unminimize(self):
+        """Give a minimized node its space back, along with its minimized
+        ancestors.
+        """
+        if not self.minimized:
+            return
+        chain = [self]
+        while not chain[-1].parent.is_root and chain[-1].parent.minimized:
+            chain.append(chain[-1].parent)
+        for node in reversed(chain):
+            node.minimized = False
+            sizing.reclaim(node)
+        self._changed()
+
+    @traced('mutation')
+    def collapse(self):
+        """Remove this container if it's redundant because it holds a single
+        child. Return whether the tree was changed.
+
+        The children of a container child are merged into the parent (their
+        orientation matches), so the geometry of all nodes is preserved.
+
+        The root is never collapsed, since its orientation is the base
+        orientation of the layout and restore state refers to its children.
+        """
+        if len(self) != 1 or self.is_root:
+            return False
+        child = self[0]
+        if not child:
+            self.parent.replace_child(self, child)
+            return True
+        parent = self.parent
+        if not (parent.split and child.split):
+            # Merging would change which nodes are shown
+            return False
+        sizes = {n: n.size for n in parent if n is not self}
+        sizes.update((n, n.size) for n in child)
+        idx = self.index
+        parent.children[idx:idx+1] = child.children
+        for node in child:
+            node.parent = parent
+        parent._changed()  # pylint: disable=protected-access
+        if any(not isclose(n.size, size) for n, size in sizes.items()):
+            # Flexible nodes would now share the space with their new
+            # siblings, so keep them at their previous size
+            for node in child:
+                if not node.fixed:
+                    node._size = sizes[node]  # pylint: disable=W0212
+        return True
+
+    @traced('mutation')
+    def normalize(self):
+        """Collapse all redundant containers in the subtree. Return the number
+        of collapsed containers.
+        """
+        # Collapse bottom-up, so merged children are already normalized
+        return sum(node.collapse() for node in reversed(sizing.preorder(self)))
+
+    @traced('mutation')
     def replace_child(self, old, new):
         self[old.index] = new
         new.parent = self
+        self._changed()
         new._size = old._size  # pylint: disable=protected-access
 
+    @traced('mutation')
     def flip_with(self, node, reverse=False):
         """Join with node in a new, orthogonal container."""
-        container = Node()
+        container = type(self)()
         self.parent.replace_child(self, container)
+        # The container only gets space once it has a visible child
+        container.minimized = self.minimized
         self.reset_size()
         for child in [node, self] if reverse else [self, node]:
             container.add_child(child)
 
+    @traced('mutation')
     def add_node(self, node, mode=None):
         """Add node according to the mode.
 
@@ -538,15 +791,20 @@ class Node:
         elif mode is None:
             self.parent.add_child_after(node, self)
         elif mode.orient is self.parent.orient:
-            if mode & AddMode.SPLIT:
+            # A minimized node has no space to split
+            if mode & AddMode.SPLIT and not self.minimized:
                 node._size = 0   # pylint: disable=protected-access
                 self.parent.add_child_after(node, self)
-                self._size = node._size = self.size / 2
+                size = self.size
+                half = size // 2 if self.exact else size / 2
+                node._size = half  # pylint: disable=protected-access
+                self._size = size - half
             else:
                 self.parent.add_child_after(node, self)
         else:
             self.flip_with(node)
 
+    @traced('mutation')
     def restore(self, node):
         """Restore node.
 
@@ -558,7 +816,7 @@ class Node:
             parent, idx, sizes, fixed, flip = restorables[node.payload]
         except KeyError:
             raise NotRestorableError()  # pylint: disable=raise-missing-from
-        if parent not in self.root:
+        if parent not in self.root and not (flip and parent.rewrap()):
             # Don't try to restore if parent is not part of the tree anymore
             raise NotRestorableError()
         node.reset_size()
@@ -576,6 +834,32 @@ class Node:
             node.reset_size()
         del restorables[node.payload]
 
+    def rewrap(self):
+        """Undo the collapse of this container, taking its former children
+        back from the parent they were merged into. Return whether they could
+        be taken back.
+
+        The container temporarily takes their place in the orientation of
+        their parent, so it has to be flipped with another node right away.
+        """
+        children = self.children
+        parent = children[0].parent if children else None
+        if parent is None or parent not in self.root:
+            return False
+        idx = parent.children.index(children[0])
+        if parent.children[idx:idx+len(children)] != children:
+            # The nodes have been rearranged since
+            return False
+        fixed = any(c.fixed for c in children)
+        size = sum(c.size for c in children)
+        parent.children[idx:idx+len(children)] = [self]
+        self.parent = parent
+        for child in children:
+            child.parent = self
+        self._size = size if fixed else None
+        self._changed()
+        return True
+
     def _save_restore_state(self):
         parent = self.parent
         sizes = (self.size,)
@@ -590,6 +874,7 @@ class Node:
         self.root.restorables[self.payload] = (parent, self.index, sizes,
                                                self.fixed, flip)
 
+    @traced('mutation')
     def move(self, direction):
         """Move this node in `direction`. Return whether node was moved."""
         if self.is_root:
@@ -600,6 +885,7 @@ class Node:
             if 0 <= new_idx < len(self.parent):
                 p = self.parent
                 p[old_idx], p[new_idx] = p[new_idx], p[old_idx]
+                self._changed()
                 return True
             new_sibling = self.parent.parent
         else:
@@ -632,6 +918,7 @@ class Node:
         if self.parent is not old_parent:
             self.integrate(direction)
 
+    @traced('mutation')
     def integrate(self, direction):
         if direction.orient != self.parent.orient:
             self._move_and_integrate(direction)
@@ -661,10 +948,48 @@ class Node:
         self.integrate(RIGHT)
 
     def find_payload(self, payload):
-        if self.payload is payload:
-            return self
-        for child in self:
-            needle = child.find_payload(payload)
-            if needle is not None:
-                return needle
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.payload is payload:
+                return node
+            stack.extend(reversed(node.children))
         return None
+
+class ProportionalNode(Node):
+    """A tree node which stores fixed sizes as fractions of the root's extent
+    in the respective dimension.
+
+    Changing the root dimensions (e.g. when moving to a screen of a different
+    resolution) then rescales all fixed sizes at once, without refitting the
+    tree.
+
+    Proportional sizes can't be exact, since rounding each size on its own
+    wouldn't preserve the total size of the siblings.
+    """
+    proportional = True
+
+    def __init__(self, payload=None, x=None, y=None, width=None, height=None):
+        if self.exact:
+            raise ValueError('Proportional sizes can\'t be exact')
+        self._ratio = None
+        super().__init__(payload, x, y, width, height)
+
+    def _extent(self):
+        root = self.root
+        return root.width if self.parent.horizontal else root.height
+
+    @property
+    def _size(self):
+        if self._ratio is None:
+            return None
+        return self._ratio * self._extent()
+
+    @_size.setter
+    def _size(self, val):
+        # A zero size may be set before the node is attached to the tree
+        self._ratio = val / self._extent() if val else val
+
+    @property
+    def fixed(self):
+        return self._ratio is not None
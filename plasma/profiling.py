@@ -0,0 +1,45 @@
+"""On-demand profiling of the running layout."""
+
+import cProfile
+import pstats
+
+
+# The active profiler (if any)
+profiler = None
+
+
+class ProfilingError(Exception):
+    pass
+
+
+def start():
+    """Start profiling all code running in this thread."""
+    global profiler  # pylint: disable=global-statement
+    if profiler is not None:
+        raise ProfilingError('Profiler is already running')
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+def stop(path, pattern='plasma/'):
+    """Stop profiling and write the stats to `path`."""
+    global profiler  # pylint: disable=global-statement
+    if profiler is None:
+        raise ProfilingError('Profiler is not running')
+    profile, profiler = profiler, None
+    profile.disable()
+    write_stats(profile, path, pattern)
+
+def write_stats(profile, path, pattern=None):
+    """Write the stats of `profile` to `path` in the `pstats` format.
+
+    If `pattern` is set, only frames whose file name contains it are kept.
+    """
+    stats = pstats.Stats(profile)
+    if pattern:
+        stats.stats = {
+            func: (cc, nc, tt, ct, {c: v for c, v in callers.items()
+                                    if pattern in c[0]})
+            for func, (cc, nc, tt, ct, callers) in stats.stats.items()
+            if pattern in func[0]
+        }
+    stats.dump_stats(path)
@@ -0,0 +1,134 @@
+"""Recording of layout sessions.
+
+A recording is a JSON lines file. The first line holds the initial state of
+the layout (configuration, root dimensions and orientation, tree and focused
+window), each following line one call of the form `[method, args, kwargs]`.
+Calls made by timers (e.g. the insertion of queued windows) are recorded
+like any other call. Windows are referred to by numeric ids that are assigned
+in order of appearance.
+
+Recordings can be replayed headless with `plasma.replay`.
+"""
+
+from functools import wraps
+import json
+
+
+# Methods which take a window as first argument
+window_methods = {'add', 'remove', 'focus', 'configure'}
+# Options which change how the layout behaves and are stored in the header
+config_options = [
+    'exact_geometry',
+    'proportional_sizes',
+    'resize_frame_interval',
+    'add_queue_delay',
+    'add_queue_max_delay',
+]
+# Commands which don't affect the layout and aren't recorded
+ignored_methods = {
+    'cmd_geometry',
+    'cmd_info_since',
+    'cmd_latencies',
+    'cmd_reset_latencies',
+    'cmd_start_trace',
+    'cmd_stop_trace',
+    'cmd_profile',
+    'cmd_start_recording',
+    'cmd_stop_recording',
+}
+
+
+class Recorder:
+
+    def __init__(self, path, layout, buffer_size=1000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.lines = []
+        self.ids = {}
+        self.depth = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.header(layout)) + '\n')
+
+    def window_id(self, window):
+        try:
+            return self.ids[id(window)][0]
+        except KeyError:
+            # Keep a reference so the id of the object can't be reused
+            self.ids[id(window)] = (len(self.ids), window)
+            return self.ids[id(window)][0]
+
+    def window(self, window):
+        return {'id': self.window_id(window),
+                'name': getattr(window, 'name', str(window))}
+
+    def dump_node(self, node):
+        return {
+            'window': (None if node.payload is None else
+                       self.window(node.payload)),
+            'size': node._size,  # pylint: disable=protected-access
+            'last_accessed': node.last_accessed,
+            'mode': node.container_mode.name,
+            'minimized': node.minimized,
+            'children': [self.dump_node(c) for c in node],
+        }
+
+    def header(self, layout):
+        root = layout.root
+        return {
+            'config': {name: getattr(layout, name) for name in config_options},
+            'root': [root.x, root.y, root.width, root.height],
+            'orient': root.root_orient.name,
+            'tree': self.dump_node(root),
+            'focused': (None if layout.focused is None else
+                        self.window_id(layout.focused)),
+        }
+
+    def enter(self, name, args, kwargs):
+        self.depth += 1
+        # Only record calls from the outside, not calls made by the layout
+        # itself (e.g. focus() triggered by a command's refocus())
+        if self.depth > 1 or name in ignored_methods:
+            return
+        args = list(args)
+        if name in window_methods:
+            args[0] = self.window(args[0])
+        if name == 'configure':
+            rect = args[1]
+            args[1] = [rect.x, rect.y, rect.width, rect.height]
+        self.lines.append(json.dumps([name, args, kwargs]))
+        if len(self.lines) >= self.buffer_size:
+            self.flush()
+
+    def leave(self):
+        self.depth -= 1
+
+    def flush(self):
+        if not self.lines:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(self.lines) + '\n')
+        self.lines = []
+
+
+def recorded(func):
+    """Log each call in the instance's `recorder` (if it's recording)."""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        recorder = self.recorder
+        if recorder is None:
+            return func(self, *args, **kwargs)
+        recorder.enter(name, args, kwargs)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            recorder.leave()
+    return wrapper
+
+def read(path):
+    """Return the header and the list of calls of a recording."""
+    with open(path, encoding='utf-8') as f:
+        header = json.loads(next(f))
+        calls = [json.loads(line) for line in f if line.strip()]
+    return header, calls
@@ -0,0 +1,173 @@
+"""Headless replay of layout sessions.
+
+Replaying a recording (see `plasma.record`) drives a `Plasma` instance
+through the same calls with stand-in windows, without a running Qtile. This
+makes recordings of real sessions usable as benchmarks and, by comparing the
+tree shapes after each step, as a correctness oracle for changes to the
+engine.
+"""
+
+from .layout import Plasma
+from .node import ContainerMode
+from .sizing import Orient
+from .record import read, window_methods
+
+
+class Rect:
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+class Window:
+    """Stand-in for a Qtile window during replay."""
+
+    def __init__(self, id_, name):
+        self.id = id_
+        self.wid = id_
+        self.name = name
+        self.has_focus = False
+        self.hidden = True
+        self.geometry = None
+        self.window = self
+
+    def __repr__(self):
+        return '<Window %s %s>' % (self.id, self.name)
+
+    def place(self, x, y, width, height, borderwidth, bordercolor,
+              **kwargs):
+        self.geometry = (x, y, width, height)
+
+    def configure(self, **kwargs):
+        pass
+
+    def hide(self):
+        self.hidden = True
+
+    def unhide(self):
+        self.hidden = False
+
+
+class Timer:
+    """Stand-in for a handle of a delayed call during replay."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Qtile:
+    """Stand-in for Qtile during replay."""
+
+    def call_later(self, delay, callback, *args):
+        # Delayed calls aren't run, since the recording holds the calls
+        # made when they were due
+        return Timer()
+
+
+class Group:
+    """Stand-in for a Qtile group during replay."""
+
+    def __init__(self, layout, name='replay'):
+        self.layout = layout
+        self.name = name
+        self.qtile = Qtile()
+        self.current_window = None
+
+    def focus(self, window):
+        if window is None:
+            return
+        if self.current_window is not None:
+            self.current_window.has_focus = False
+        window.has_focus = True
+        self.current_window = window
+        self.layout.focus(window)
+
+
+class Replayer:
+
+    def __init__(self, layout=None):
+        # Without a layout, one is created with the recorded configuration
+        self.layout = layout
+        self.windows = {}
+
+    def window(self, data):
+        try:
+            return self.windows[data['id']]
+        except KeyError:
+            window = self.windows[data['id']] = Window(data['id'],
+                                                       data['name'])
+            return window
+
+    def load_node(self, data, node):
+        node.last_accessed = data['last_accessed']
+        node.container_mode = ContainerMode[data.get('mode', 'SPLIT')]
+        node.minimized = data.get('minimized', False)
+        node_class = type(self.layout.root)
+        for child_data in data['children']:
+            window = child_data['window']
+            child = node_class(None if window is None else self.window(window))
+            node.children.append(child)
+            child.parent = node
+            # Sizes can only be set once the node is part of the tree, as
+            # they may be stored relative to the root
+            child._size = child_data['size']  # pylint: disable=W0212
+            self.load_node(child_data, child)
+
+    def load(self, header):
+        """Restore the initial state of the layout."""
+        if self.layout is None:
+            self.layout = Plasma(**header.get('config', {}))
+        self.layout.group = Group(self.layout)
+        root = self.layout.root
+        root.x, root.y, root.width, root.height = header['root']
+        root.root_orient = Orient[header.get('orient', 'HORIZONTAL')]
+        self.load_node(header['tree'], root)
+        root._changed()  # pylint: disable=protected-access
+        if header['focused'] is not None:
+            self.layout.group.focus(self.windows[header['focused']])
+
+    def step(self, call):
+        """Apply a single recorded call to the layout."""
+        name, args, kwargs = call
+        if name in window_methods:
+            args[0] = self.window(args[0])
+        if name == 'configure':
+            args[1] = Rect(*args[1])
+        if name == 'focus':
+            self.layout.group.focus(args[0])
+            return
+        getattr(self.layout, name)(*args, **kwargs)
+
+    def run(self, path):
+        """Replay the recording in `path`, yielding after each call."""
+        header, calls = read(path)
+        self.load(header)
+        for call in calls:
+            self.step(call)
+            yield call
+
+
+def shape(layout):
+    """Return the tree of `layout` with windows represented by their ids."""
+    def convert(tree):
+        return [convert(n) if isinstance(n, list) else n.payload.id
+                for n in tree]
+    return convert(layout.root.tree)
+
+def replay(path, layout=None):
+    """Replay a recording and return the layout."""
+    replayer = Replayer(layout)
+    for _ in replayer.run(path):
+        pass
+    return replayer.layout
+
+def shapes(path, layout=None):
+    """Replay a recording and return the tree shape after each call."""
+    replayer = Replayer(layout)
+    return [shape(replayer.layout) for _ in replayer.run(path)]
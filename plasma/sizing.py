@@ -0,0 +1,314 @@
+"""Computation of sizes and positions over whole subtrees.
+
+None of the computations use recursion, so deep trees don't exceed Python's
+recursion limit. Recursive computations are written as generators which
+yield a generator for each nested computation and are run by `run()`.
+"""
+
+from collections import namedtuple
+from enum import Flag
+
+
+Dimensions = namedtuple('Dimensions', 'x y width height')
+Geometry = namedtuple('Geometry',
+                      'node depth orient x y width height size flexible')
+
+class Orient(Flag):
+    HORIZONTAL = 0
+    VERTICAL = 1
+
+# (Iterating over a Flag skips the zero member on newer Pythons.)
+HORIZONTAL, VERTICAL = Orient.HORIZONTAL, Orient.VERTICAL
+# Looking up the flipped orientation is much cheaper than inverting a Flag.
+FLIPPED = {HORIZONTAL: VERTICAL, VERTICAL: HORIZONTAL}
+
+def pixel_perfect(x, y, width, height):
+    """Convert dimensions to ints, compensating for gaps in the layout grid
+    caused by plain int conversion.
+    """
+    threshold = 0.99999
+    if (x - int(x)) + (width - int(width)) > threshold:
+        width += 1
+    if (y - int(y)) + (height - int(height)) > threshold:
+        height += 1
+    return Dimensions(*map(int, (x, y, width, height)))
+
+def distribute(total, weights):
+    """Split the int `total` into ints proportional to `weights` which add
+    up to `total` exactly.
+
+    The remainder left by rounding down is handed out one by one to the
+    largest fractional parts (ties go to the first ones).
+    """
+    weight_sum = sum(weights)
+    if not weight_sum:
+        weights = [1] * len(weights)
+        weight_sum = len(weights)
+    shares = [divmod(total * w, weight_sum) for w in weights]
+    rest = total - sum(q for q, _ in shares)
+    order = sorted(range(len(shares)), key=lambda i: -shares[i][1])
+    result = [q for q, _ in shares]
+    for i in order[:rest]:
+        result[i] += 1
+    return result
+
+def preorder(node):
+    """Return all nodes of the subtree of `node` in pre-order."""
+    nodes = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(reversed(node.children))
+    return nodes
+
+def run(gen):
+    """Run a recursive computation written as a generator without using the
+    call stack.
+
+    The generator yields a generator for each nested computation and is sent
+    its result. The result of the outermost generator is returned.
+    """
+    stack = [gen]
+    result = None
+    while True:
+        try:
+            nested = stack[-1].send(result)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value
+            result = stop.value
+        else:
+            stack.append(nested)
+            result = None
+
+def position(node, horizontal):
+    """Return the x (if `horizontal`) or y coordinate of `node`."""
+    # The node is offset in each ancestor container which is aligned
+    # along the axis
+    offsets = []
+    parent_horizontal = node.orient is VERTICAL
+    while not node.is_root:
+        if parent_horizontal is horizontal:
+            offsets.append(node.size_offset)
+        node = node.parent
+        parent_horizontal = not parent_horizontal
+    pos = node.x if horizontal else node.y
+    for offset in reversed(offsets):
+        pos += offset
+    return pos
+
+def reclaim(node):
+    """Give a node that is no longer minimized its space back from its
+    siblings.
+    """
+    parent = node.parent
+    if not parent.split:
+        return
+    if node.fixed:
+        node.size = node._size  # pylint: disable=protected-access
+        return
+    total = parent.capacity
+    count = sum(1 for c in parent if not c.minimized)
+    share = total // count if node.exact else total / count
+    run(fit_into(node.siblings, total - share))
+
+def fit_into(nodes, space):
+    """Resize nodes to fit them into the available space."""
+    nodes = [n for n in nodes if not n.minimized]
+    if not nodes:
+        return
+    occupied = sum(n.min_size for n in nodes)
+    if space >= occupied and any(n.flexible for n in nodes):
+        # If any flexible node exists, it will occupy the space
+        # automatically, not requiring any action.
+        return
+    nodes_left = nodes[:]
+    space_left = space
+    if space < occupied:
+        for node in nodes:
+            if node.min_size_bound != node.min_size:
+                continue
+            # Substract nodes that are already at their minimal possible
+            # size because they can't be shrinked any further.
+            space_left -= node.min_size
+            nodes_left.remove(node)
+    if not nodes_left:
+        return
+    sizes = [n.size for n in nodes_left]
+    if nodes_left[0].exact:
+        new_sizes = distribute(space_left, sizes)
+    elif not sum(sizes):
+        # Nodes without any space yet (e.g. added next to a minimized node)
+        # get even shares
+        new_sizes = [space_left / len(sizes)] * len(sizes)
+    else:
+        factor = space_left / sum(sizes)
+        new_sizes = (size * factor for size in sizes)
+    for node, new_size in zip(nodes_left, new_sizes):
+        if node.fixed:
+            node._size = new_size  # pylint: disable=protected-access
+        for child in node:
+            yield fit_into(child, new_size)
+
+def min_size(node):
+    if node.minimized:
+        return 0
+    if node.fixed:
+        return node._size  # pylint: disable=protected-access
+    if node.is_leaf:
+        return node.min_size_default
+    size = 0
+    for child in node:
+        total = 0
+        for grandchild in child:
+            total += yield min_size(grandchild)
+        size = max(size, total)
+    return max(size, node.min_size_default)
+
+def min_size_bound(node):
+    if node.minimized:
+        return 0
+    if node.is_leaf:
+        return node.min_size_default
+    bound = 0
+    for child in node:
+        total = 0
+        for grandchild in child:
+            total += yield min_size_bound(grandchild)
+        bound = max(bound, total or node.min_size_default)
+    return bound
+
+def flexible(node):
+    if node.fixed or node.minimized:
+        return False
+    for child in node:
+        if child.is_leaf:
+            continue
+        for grandchild in child:
+            if (yield flexible(grandchild)):
+                break
+        else:
+            return False
+    return True
+
+def scale(node, factors):
+    """Scale all fixed sizes in the subtree of `node` by the factor for the
+    orientation they're sized in (`factors` maps each orientation to its
+    factor).
+    """
+    stack = [(node, node.orient)]
+    while stack:
+        node, orient = stack.pop()
+        factor = factors[orient]
+        fixed = [c for c in node if c.fixed]
+        sizes = [c._size for c in fixed]  # pylint: disable=protected-access
+        if node.exact:
+            sizes = distribute(round(sum(sizes) * factor), sizes)
+        else:
+            sizes = [s * factor for s in sizes]
+        for child, size in zip(fixed, sizes):
+            child._size = size  # pylint: disable=protected-access
+        stack.extend((c, FLIPPED[orient]) for c in node)
+
+def size_info(node):
+    """Return the min sizes and flexibility of all nodes in the subtree
+    as two dicts, computed bottom-up in a single pass.
+    """
+    min_sizes = {}
+    flexibles = {}
+    for n in reversed(preorder(node)):
+        if n.minimized:
+            min_sizes[n] = 0
+            flexibles[n] = False
+        elif n.fixed:
+            min_sizes[n] = n._size  # pylint: disable=protected-access
+            flexibles[n] = False
+        elif not n:
+            min_sizes[n] = n.min_size_default
+            flexibles[n] = True
+        else:
+            min_sizes[n] = max(
+                max(sum(min_sizes[gc] for gc in c) for c in n),
+                n.min_size_default)
+            flexibles[n] = all(
+                any(flexibles[gc] for gc in c) or not c for c in n)
+    return min_sizes, flexibles
+
+def fill_flexible(sizes, capacity, exact=False):
+    """Replace the `None` entries in the child sizes `sizes` by an even share
+    of the space left.
+    """
+    flexible_count = sizes.count(None)
+    if not flexible_count:
+        return sizes
+    space = capacity - sum(s for s in sizes if s is not None)
+    if exact:
+        share, rest = divmod(space, flexible_count)
+        shares = iter([share + 1] * rest + [share] * (flexible_count - rest))
+    else:
+        shares = iter([space / flexible_count] * flexible_count)
+    return [next(shares) if s is None else s for s in sizes]
+
+def geometry(node, rect=None):
+    """Yield the geometry of all nodes in the subtree of `node` in pre-order.
+
+    If `rect` (x, y, width, height) is given, the subtree is laid out in that
+    area instead of its own.
+
+    All values are computed in a single pass instead of evaluating the
+    properties of each node (which walk the tree), so this takes linear time.
+    Minimized nodes and hidden children of tabbed and stacked containers are
+    skipped with their subtrees.
+    """
+    min_sizes, flexibles = size_info(node)
+    x, y, width, height = rect or (node.x, node.y, node.width, node.height)
+    stack = [Geometry(node, 0, node.orient, x, y, width, height, node.size,
+                      node.flexible)]
+    while stack:
+        geo = stack.pop()
+        yield geo
+        node = geo.node
+        if not node:
+            continue
+        horizontal = geo.orient is HORIZONTAL
+        capacity = geo.width if horizontal else geo.height
+        if not node.split:
+            child = node.active_child
+            if child is None:
+                continue
+            stack.append(geo._replace(
+                node=child, depth=geo.depth + 1,
+                orient=FLIPPED[geo.orient], size=capacity,
+                flexible=flexibles[child]))
+            continue
+        sizes = []
+        for child in node:
+            if child.minimized:
+                sizes.append(0)
+            elif child.fixed:
+                sizes.append(child._size)  # pylint: disable=protected-access
+            elif flexibles[child]:
+                sizes.append(None)
+            else:
+                sizes.append(max(sum(min_sizes[gc] for gc in c)
+                                 for c in child))
+        sizes = fill_flexible(sizes, capacity, node.exact)
+        orient = FLIPPED[geo.orient]
+        depth = geo.depth + 1
+        offset = 0
+        children = []
+        for child, size in zip(node, sizes):
+            if child.minimized:
+                continue
+            if horizontal:
+                children.append(Geometry(
+                    child, depth, orient, geo.x + offset, geo.y, size,
+                    geo.height, size, flexibles[child]))
+            else:
+                children.append(Geometry(
+                    child, depth, orient, geo.x, geo.y + offset,
+                    geo.width, size, size, flexibles[child]))
+            offset += size
+        stack.extend(reversed(children))
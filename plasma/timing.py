@@ -0,0 +1,94 @@
+from collections import deque
+from functools import wraps
+from time import perf_counter
+
+from . import trace
+from .record import recorded
+
+
+class Histogram:
+    """A rolling window of latency samples.
+
+    Only the most recent `size` samples are kept, so percentiles reflect the
+    current behavior rather than the whole session.
+    """
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def percentile(self, ordered, p):
+        """Return the `p`-th percentile (nearest rank) of sorted samples."""
+        if not ordered:
+            return None
+        rank = max(int(round(p / 100 * len(ordered))), 1)
+        return ordered[rank-1]
+
+    def summary(self):
+        """Return count and p50/p95/p99/max latency in milliseconds."""
+        ordered = sorted(self.samples)
+        summary = {'count': self.count,
+                   'max': ordered[-1] * 1000 if ordered else None}
+        for p in (50, 95, 99):
+            value = self.percentile(ordered, p)
+            summary['p%d' % p] = None if value is None else value * 1000
+        return summary
+
+
+class Latencies:
+    """Latency histograms keyed by method name."""
+
+    def __init__(self, size=1000):
+        self.size = size
+        self.histograms = {}
+
+    def add(self, name, value):
+        try:
+            histogram = self.histograms[name]
+        except KeyError:
+            histogram = self.histograms[name] = Histogram(self.size)
+        histogram.add(value)
+
+    def summary(self):
+        return {name: h.summary() for name, h in self.histograms.items()}
+
+    def reset(self):
+        self.histograms.clear()
+
+
+def timed(func):
+    """Record the latency of each call in the instance's `latencies` and, if
+    tracing is active, as a trace span.
+    """
+    name = func.__name__
+    cat = 'command' if name.startswith('cmd_') else 'layout'
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self.latencies is None and trace.tracer is None:
+            return func(self, *args, **kwargs)
+        start = perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            end = perf_counter()
+            if self.latencies is not None:
+                self.latencies.add(name, end - start)
+            if trace.tracer is not None:
+                trace.tracer.add(name, cat, start, end)
+    return wrapper
+
+def instrument(*names):
+    """Class decorator to time and record all `cmd_*` methods and the methods
+    `names`.
+    """
+    def decorate(cls):
+        for name, attr in list(vars(cls).items()):
+            if callable(attr) and (name.startswith('cmd_') or name in names):
+                setattr(cls, name, timed(recorded(attr)))
+        return cls
+    return decorate
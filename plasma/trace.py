@@ -0,0 +1,133 @@
+"""Opt-in tracing of layout operations.
+
+Spans are collected in memory and written in bulk to a file in Chrome's
+trace-event format, which can be opened in chrome://tracing or Perfetto.
+"""
+
+from functools import wraps
+import json
+import os
+from time import perf_counter
+
+
+# The active tracer (if any)
+tracer = None
+
+
+class Tracer:
+
+    def __init__(self, path, buffer_size=10000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.events = []
+        self.pid = os.getpid()
+        self.written = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[\n')
+
+    def add(self, name, cat, begin, end, args=None):
+        """Add a complete event spanning from `begin` to `end` (both in
+        seconds, as returned by `perf_counter()`).
+        """
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': begin * 1e6,
+            'dur': (end - begin) * 1e6,
+            'pid': self.pid,
+            'tid': 0,
+        }
+        if args:
+            event['args'] = args
+        self.events.append(event)
+        if len(self.events) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Append all buffered events to the file."""
+        if not self.events:
+            return
+        lines = [json.dumps(e, separators=(',', ':')) for e in self.events]
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if self.written:
+                f.write(',\n')
+            f.write(',\n'.join(lines))
+        self.written += len(lines)
+        self.events = []
+
+    def close(self):
+        self.flush()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n]\n')
+
+
+class Span:
+
+    def __init__(self, name, cat, args=None):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if tracer is not None:
+            tracer.add(self.name, self.cat, self.start, perf_counter(),
+                       self.args)
+
+
+class NullSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+null_span = NullSpan()
+
+
+def span(name, cat, args=None):
+    """Return a context manager recording a span if tracing is active."""
+    if tracer is None:
+        return null_span
+    return Span(name, cat, args)
+
+def traced(cat):
+    """Decorator to record a span for each call if tracing is active."""
+    def decorate(func):
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if tracer is None:
+                return func(*args, **kwargs)
+            begin = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if tracer is not None:
+                    tracer.add(name, cat, begin, perf_counter())
+        return wrapper
+    return decorate
+
+def start(path, buffer_size=10000):
+    """Start tracing into the file `path`, replacing an active tracer.
+    Return the new tracer.
+    """
+    global tracer  # pylint: disable=global-statement
+    stop()
+    tracer = Tracer(path, buffer_size)
+    return tracer
+
+def stop():
+    """Stop tracing and write all remaining events."""
+    global tracer  # pylint: disable=global-statement
+    if tracer is None:
+        return
+    tracer.close()
+    tracer = None
@@ -0,0 +1,149 @@
+"""Synthetic workloads for the node engine.
+
+A workload is a reproducible sequence of operations modelled on real desktop
+sessions: a burst of windows opened at login, followed by a mix of focus
+navigation, auto-repeated resizing, integrating/moving and opening/closing
+windows. Focus navigation and resizing come in runs, like a held-down key.
+"""
+
+from collections import namedtuple
+import random
+
+from .node import Node, AddMode, UP, DOWN, LEFT, RIGHT
+
+
+Op = namedtuple('Op', 'kind payload arg')
+
+directions = [UP, DOWN, LEFT, RIGHT]
+add_modes = [None, AddMode.HORIZONTAL, AddMode.VERTICAL,
+             AddMode.HORIZONTAL | AddMode.SPLIT,
+             AddMode.VERTICAL | AddMode.SPLIT]
+
+default_weights = {
+    'open': 2,
+    'close': 2,
+    'focus': 8,
+    'resize': 4,
+    'integrate': 1,
+    'move': 1,
+}
+
+
+class Workload:
+    """Generator of operation sequences.
+
+    `weights` set the relative frequency of each operation kind after the
+    login burst of `login_windows` opens. `repeat` is the range of how often
+    a focus or resize operation is repeated in a row.
+    """
+
+    def __init__(self, seed=0, steps=1000, login_windows=40,
+                 max_windows=100, weights=None, repeat=(5, 30),
+                 resize_step=10):
+        self.seed = seed
+        self.steps = steps
+        self.login_windows = login_windows
+        self.max_windows = max_windows
+        self.weights = dict(default_weights, **(weights or {}))
+        if not any(w > 0 for w in self.weights.values()):
+            raise ValueError('At least one operation needs a positive weight')
+        if max_windows < 1:
+            raise ValueError('max_windows must be at least 1')
+        self.repeat = repeat
+        self.resize_step = resize_step
+
+    def __iter__(self):
+        rand = random.Random(self.seed)
+        alive = []
+        counter = 0
+        kinds = [k for k, w in self.weights.items() if w > 0]
+        weights = [self.weights[k] for k in kinds]
+        other_kinds = [k for k in kinds if k != 'open']
+        other_weights = [self.weights[k] for k in other_kinds]
+
+        def open_window():
+            nonlocal counter
+            payload = 'w%d' % counter
+            counter += 1
+            alive.append(payload)
+            return Op('open', payload, rand.choice(add_modes))
+
+        for _ in range(min(self.login_windows, self.max_windows)):
+            yield open_window()
+        steps = 0
+        while steps < self.steps:
+            kind = rand.choices(kinds, weights)[0]
+            if kind == 'open' and len(alive) >= self.max_windows:
+                # Do something else instead, closing a window if nothing
+                # else is weighted
+                kind = (rand.choices(other_kinds, other_weights)[0] if
+                        other_kinds else 'close')
+            if kind == 'open' or not alive:
+                yield open_window()
+                steps += 1
+            elif kind == 'close':
+                payload = alive.pop(rand.randrange(len(alive)))
+                yield Op('close', payload, None)
+                steps += 1
+            elif kind in ('focus', 'resize'):
+                if kind == 'focus':
+                    arg = rand.choice(directions)
+                else:
+                    arg = (rand.choice(['width', 'height']),
+                           rand.choice([-1, 1]) * self.resize_step)
+                repeat = rand.randint(*self.repeat)
+                for _ in range(min(repeat, self.steps - steps)):
+                    yield Op(kind, None, arg)
+                    steps += 1
+            else:
+                yield Op(kind, None, rand.choice(directions))
+                steps += 1
+
+
+class Runner:
+    """Apply workload operations to a tree, keeping track of the focus like
+    the layout does.
+    """
+
+    def __init__(self, root=None):
+        if root is None:
+            root = Node(None, 0, 0, 1920, 1080)
+        self.root = root
+        self.focused = None
+
+    def focus(self, node):
+        self.focused = node
+        node.access()
+
+    def apply(self, op):
+        kind, payload, arg = op
+        focused = self.focused
+        if kind == 'open':
+            new = Node(payload)
+            (self.root if focused is None else focused).add_node(new, arg)
+            self.focus(new)
+        elif kind == 'close':
+            node = self.root.find_payload(payload)
+            node.remove()
+            if node is focused:
+                self.focused = None
+                if self.root:
+                    self.focus(self.root.recent_leaf)
+        elif focused is None:
+            return
+        elif kind == 'focus':
+            neighbor = focused.close_neighbor(arg)
+            if neighbor is not None:
+                self.focus(neighbor)
+        elif kind == 'resize':
+            dimension, delta = arg
+            setattr(focused, dimension, getattr(focused, dimension) + delta)
+        elif kind == 'integrate':
+            focused.integrate(arg)
+        elif kind == 'move':
+            focused.move(arg)
+
+    def run(self, ops):
+        for op in ops:
+            self.apply(op)
+        return self.root
@@ -9,7 +9,7 @@ setup(
     author_email='numirias@users.noreply.github.com',
     url='https://github.com/numirias/qtile-plasma',
     license='MIT',
-    python_requires='>=3',
+    python_requires='>=3.6',
     install_requires=['xcffib>=0.5.0', 'qtile>=0.17'],
     classifiers=[
         'Development Status :: 4 - Beta',
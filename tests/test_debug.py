@@ -1,5 +1,15 @@
-from plasma.debug import draw, tree, info
+import io
+import json
 
+from plasma.debug import (Canvas, draw, dump_tree, export_ppm, export_svg,
+                          leaf_rects, rgb, tree, info)
+from plasma.node import ContainerMode, Node
+
+
+def tree_json(root):
+    out = io.StringIO()
+    dump_tree(root, out, fmt='json')
+    return out.getvalue()
 
 class TestDebugging:
 
@@ -10,6 +20,52 @@ class TestDebugging:
         assert lines[2].strip().startswith('*')
         assert lines[3].strip().startswith('b')
 
+    def test_dump_tree(self, root, grid):
+        a, b, c, d, e = grid
+        a.size = 70
+        text = io.StringIO()
+        dump_tree(root, text)
+        assert text.getvalue() == tree(root)
+        lines = io.StringIO()
+        dump_tree(root, lines, fmt='json')
+        records = [json.loads(line) for line in
+                   lines.getvalue().splitlines()]
+        assert [r['name'] for r in records] == \
+            ['root', 'a', None, 'b', None, 'c', 'd', 'e']
+        assert records[1] == {
+            'name': 'a', 'depth': 1, 'orient': 'V', 'x': 0, 'y': 0,
+            'width': 70, 'height': 50, 'size': 70, 'fixed': True,
+            'flexible': False, 'hidden': False, 'minimized': False,
+        }
+        assert records[7]['depth'] == 3
+        assert records[7]['x'] == e.x
+
+    def test_tree_hidden(self, root, grid):
+        a, b, c, d, e = grid
+        a.minimize()
+        c.parent.container_mode = ContainerMode.TABBED
+        d.access()
+        lines = tree(root).splitlines()
+        assert len(lines) == 8
+        assert 'minimized' in lines[1]
+        assert 'hidden' in lines[5]
+        assert 'hidden' not in lines[6]
+        records = [json.loads(line) for line in
+                   io.StringIO(tree_json(root)).readlines()]
+        assert [r['name'] for r in records if r['hidden']] == ['a', 'c', 'e']
+        assert records[1]['minimized']
+        assert records[5]['x'] is None
+        assert records[5]['orient'] == 'V'
+
+    def test_tree_large(self):
+        root = Node(None, 0, 0, 100000, 100000)
+        leafs = [Node(i) for i in range(1000)]
+        for leaf in leafs:
+            root.add_child(leaf)
+        for leaf in leafs:
+            leaf.flip_with(Node('x'))
+        assert len(tree(root).splitlines()) == 3001
+
     def test_draw(self, root, grid):
         a, *_ = grid
         root._width = 24
@@ -29,6 +85,84 @@ class TestDebugging:
         └──────────┘└──┘└──┘└──┘
         '''.replace(' ', '')[1:]
 
+    def test_draw_scaled(self, root, grid):
+        root._width = 240
+        root._height = 100
+        scaled = draw(root, 24, 10)
+        assert len(draw(root, width=24).split('\n')) == 5 + 1
+        assert len(draw(root, height=10).split('\n')[0]) == 48
+        root._width = 24
+        root._height = 10
+        assert scaled == draw(root)
+
+    def test_draw_offset(self, root, grid):
+        root.x = 100
+        root.y = 50
+        assert '#' not in draw(root)
+
+    def test_draw_large(self):
+        root = Node(None, 0, 0, 3840, 2160)
+        for i in range(50):
+            root.add_child(Node('n%d' % i))
+        for node in list(root):
+            node.flip_with(Node(node.payload + 'x'))
+        view = draw(root, 120, 40)
+        lines = view.split('\n')[:-1]
+        assert len(lines) == 40
+        assert all(len(line) == 120 for line in lines)
+        assert '#' not in view
+        assert '+' in draw(root, 40, 10)
+
+    def test_canvas_clip(self):
+        canvas = Canvas(4, 3)
+        canvas.add_box(-1, -1, 6, 5, 'xyz')
+        canvas.add_box(3, 2, 4, 4)
+        assert canvas.view() == 'xyz.\n....\n...\u250c\n'
+
+    def test_export_ppm(self, root, grid):
+        a, b, c, d, e = grid
+        d.size = 30
+        colors = {'border_normal': '#111111', 'border_focus': '#222222',
+                  'border_normal_fixed': '#333333'}
+        f = io.BytesIO()
+        export_ppm(root, f, focused='b', colors=colors, fill='#000000')
+        header, data = f.getvalue().split(b'\n255\n', 1)
+        assert header == b'P6\n120 50'
+        assert len(data) == 120 * 50 * 3
+        # Compare with a naive per-pixel rendering
+        pixels = [[b'?'] * 120 for _ in range(50)]
+        for x, y, w, h, color in leaf_rects(root, 'b', colors):
+            for j in range(y, y + h):
+                for i in range(x, x + w):
+                    border = i in (x, x + w - 1) or j in (y, y + h - 1)
+                    pixels[j][i] = rgb(color) if border else rgb('#000000')
+        assert data == b''.join(b''.join(row) for row in pixels)
+        assert data[:3] == rgb('#111111')
+        assert data[60*3:61*3] == rgb('#222222')
+        assert rgb('#333333') in data
+        assert rgb('#ff00ff') not in data
+
+    def test_export_ppm_large(self):
+        root = Node(None, 0, 0, 3840, 2160)
+        for i in range(40):
+            root.add_child(Node('n%d' % i))
+        for node in list(root):
+            node.flip_with(Node('y'))
+            for i in range(50):
+                node.parent.add_child(Node('x'))
+        f = io.BytesIO()
+        export_ppm(root, f, border_width=2)
+        assert len(f.getvalue()) == len(b'P6\n3840 2160\n255\n') + \
+            3840 * 2160 * 3
+
+    def test_export_svg(self, root, grid):
+        f = io.StringIO()
+        export_svg(root, f, border_width=2)
+        svg = f.getvalue()
+        assert svg.startswith('<svg')
+        assert svg.count('<rect') == 1 + 2 * 5
+        assert 'fill="#333333"' in svg
+
     def test_info(self, root, grid, capsys):
         info(root)
         out, _ = capsys.readouterr()
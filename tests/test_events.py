@@ -0,0 +1,40 @@
+from plasma.events import Event, Events
+
+
+class TestEvents:
+
+    def test_batched(self):
+        events = Events()
+        received = []
+        events.emit('add', 'a')
+        events.subscribe(received.append)
+        events.emit('add', 'a')
+        events.emit('focus', 'a')
+        assert received == []
+        events.flush({'a': (0, 0, 10, 10)})
+        assert received == [[
+            Event('add', 'a', None),
+            Event('focus', 'a', None),
+            Event('geometry', None, {'a': (0, 0, 10, 10)}),
+        ]]
+
+    def test_geometry_diff(self):
+        events = Events()
+        received = []
+        events.subscribe(received.append)
+        events.flush({'a': (0, 0, 10, 10), 'b': (10, 0, 10, 10)})
+        events.flush({'a': (0, 0, 10, 10), 'b': (10, 0, 10, 10)})
+        assert len(received) == 1
+        events.flush({'a': (0, 0, 20, 10)})
+        assert received[-1] == [
+            Event('geometry', None, {'a': (0, 0, 20, 10), 'b': None})]
+
+    def test_unsubscribe(self):
+        events = Events()
+        received = []
+        events.subscribe(received.append)
+        events.emit('add', 'a')
+        events.unsubscribe(received.append)
+        events.flush({})
+        assert not events.pending
+        assert received == []
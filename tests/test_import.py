@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+
+# Maximum time to import the tree engine in a fresh interpreter
+import_budget = 0.5
+
+def run(code):
+    return subprocess.run([sys.executable, '-c', code], check=True,
+                          stdout=subprocess.PIPE,
+                          universal_newlines=True).stdout.split()
+
+class TestImport:
+
+    def test_node_without_qtile(self):
+        loaded = run(
+            'import sys\n'
+            'import plasma.node, plasma.debug\n'
+            'print(*[m in sys.modules for m in '
+            '("plasma.layout", "libqtile", "xcffib")])'
+        )
+        assert loaded == ['False', 'False', 'False']
+
+    def test_import_time(self):
+        duration, = run(
+            'from time import perf_counter\n'
+            'start = perf_counter()\n'
+            'import plasma.node\n'
+            'print(perf_counter() - start)'
+        )
+        assert float(duration) < import_budget
+
+    def test_lazy_layout(self):
+        import plasma
+        from plasma.layout import Plasma
+        assert plasma.Plasma is Plasma
+        assert 'Plasma' in dir(plasma)
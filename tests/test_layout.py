@@ -1,10 +1,13 @@
+import json
 from pathlib import Path
-from pytest import fixture, mark
+from pytest import approx, fixture, mark, raises
 import sys
 import time
 
+from libqtile import hook
 from plasma import Plasma
-from plasma.node import Node
+from plasma.node import Node, HORIZONTAL
+from plasma.replay import Group, Rect, Window
 
 # We borrow Qtile's testing framework. That's not elegant but the best option.
 sys.path.insert(0, str(Path(__file__).parents[1] / 'lib'))  # noqa: E402
@@ -50,6 +53,27 @@ def plasma_config(func):
 def tree(qtile):
     return qtile.c.layout.info()['tree']
 
+class Timer:
+    """Stand-in for a handle returned by Qtile's `call_later()`."""
+
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class EventLoop:
+    """Stand-in for Qtile's scheduling of delayed calls."""
+
+    def __init__(self):
+        self.timers = []
+
+    def call_later(self, delay, callback):
+        self.timers.append(Timer(delay, callback))
+        return self.timers[-1]
+
 class TestLayout:
 
     def test_init(self):
@@ -80,6 +104,479 @@ class TestLayout:
         layout.focus('a')
         assert layout.root.find_payload('a').last_accessed > now
 
+    def test_latencies(self, root):
+        layout = Plasma()
+        layout.root = root
+        layout.add('a')
+        layout.add('b')
+        layout.cmd_mode_vertical()
+        latencies = layout.cmd_latencies()
+        assert latencies['add']['count'] == 2
+        assert latencies['cmd_mode_vertical']['count'] == 1
+        assert latencies['add']['max'] >= latencies['add']['p50'] >= 0
+        layout.cmd_reset_latencies()
+        assert 'add' not in layout.cmd_latencies()
+
+    def test_trace(self, root, tmp_path):
+        path = str(tmp_path / 'trace.json')
+        layout = Plasma()
+        layout.root = root
+        layout.cmd_start_trace(path)
+        layout.add('a')
+        layout.cmd_mode_vertical()
+        layout.cmd_stop_trace()
+        with open(path) as f:
+            events = json.load(f)
+        names = [e['name'] for e in events]
+        assert 'add' in names
+        assert 'cmd_mode_vertical' in names
+        assert 'Node.add_node' in names
+
+    def test_exact_geometry(self):
+        layout = Plasma(exact_geometry=True)
+        layout.add('a')
+        layout.add('b')
+        layout.add('c')
+        root = layout.root
+        assert root.exact and type(root.find_payload('c')).exact
+        assert [n.width for n in root] == [334, 333, 333]
+        assert not Plasma().root.exact
+
+    def test_proportional_exact(self):
+        with raises(ValueError):
+            Plasma(proportional_sizes=True, exact_geometry=True)
+
+    def test_proportional_sizes(self):
+        layout = Plasma(proportional_sizes=True)
+        layout.add('a')
+        layout.add('b')
+        layout.root.find_payload('a').width = 300
+        layout.root.width = 2000
+        assert layout.root.find_payload('a').width == 600
+        assert layout.root.find_payload('b').width == 1400
+
+    def test_configure_screen_change(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b = Window(0, 'a'), Window(1, 'b')
+        layout.add(a)
+        layout.add(b)
+        layout.root.find_payload(a).width = 300
+        layout.configure(a, Rect(0, 0, 1000, 1000))
+        version = layout.root.version
+        layout.configure(b, Rect(0, 0, 1000, 1000))
+        assert layout.root.version == version
+        assert b.geometry == (300, 0, 698, 998)
+        layout.configure(a, Rect(0, 20, 2000, 500))
+        assert a.geometry == (0, 20, 598, 498)
+        assert layout.geometry(layout.root.find_payload(b)).width == 1400
+
+    def test_remove_and_restore(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        layout.add(a)
+        layout.group.focus(a)
+        layout.add(b)
+        layout.group.focus(b)
+        layout.cmd_mode_vertical()
+        layout.add(c)
+        layout.group.focus(c)
+        layout.remove(a)
+        layout.add(a)
+        assert layout.convert_names(layout.root.tree) == ['a', ['b', 'c']]
+
+    def test_orientation_after_emptied(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        layout.add(a)
+        layout.group.focus(a)
+        layout.cmd_mode_vertical()
+        layout.add(b)
+        layout.group.focus(b)
+        for window in (a, b):
+            layout.remove(window)
+        for window in (a, c):
+            layout.add(window)
+            layout.group.focus(window)
+        assert layout.root.orient is HORIZONTAL
+        assert len(layout.root) == 2
+        assert layout.find_node(a).x != layout.find_node(c).x
+
+    def test_tabbed(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        rect = Rect(0, 0, 1000, 1000)
+        for window in (a, b, c):
+            layout.add(window)
+            layout.group.focus(window)
+        layout.cmd_layout_tabbed()
+        hidden = []
+        a.hide = b.hide = lambda: hidden.append(1)
+        for _ in range(2):
+            for window in (a, b, c):
+                layout.configure(window, rect)
+        assert c.geometry == (0, 0, 998, 998)
+        assert len(hidden) == 2
+        assert layout.hidden == {a, b}
+        layout.group.focus(a)
+        layout.configure(a, rect)
+        assert a.geometry == (0, 0, 998, 998)
+        assert layout.hidden == {b}
+        layout.cmd_layout_split()
+        layout.configure(b, rect)
+        assert b.geometry[2] < 998
+
+    def test_tabbed_directions(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        for window in (a, b, c):
+            layout.add(window)
+            layout.group.focus(window)
+        layout.cmd_layout_tabbed()
+        layout.cmd_left()
+        assert layout.focused is b
+        layout.cmd_left()
+        assert layout.focused is a
+        layout.cmd_left()
+        assert layout.focused is a
+        layout.cmd_right()
+        assert layout.focused is b
+        layout.cmd_layout_stacked()
+        layout.cmd_down()
+        assert layout.focused is c
+
+    def test_zoom(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        rect = Rect(0, 0, 1000, 1000)
+        for window in (a, b, c):
+            layout.add(window)
+            layout.group.focus(window)
+        layout.group.focus(b)
+        for window in (a, b, c):
+            layout.configure(window, rect)
+        geometry = layout._geometry
+        layout.cmd_zoom()
+        for window in (a, b, c):
+            layout.configure(window, rect)
+        assert b.geometry == (0, 0, 1000, 1000)
+        assert layout.hidden == {a, c}
+        assert layout.geometry(layout.root.find_payload(a)) is None
+        layout.cmd_zoom()
+        assert layout.zoomed is None
+        assert layout._geometry is geometry
+        layout.configure(a, rect)
+        assert a.geometry[2] < 998
+        assert layout.hidden == {c}
+
+    def test_minimize(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        rect = Rect(0, 0, 900, 900)
+        for window in (a, b, c):
+            layout.add(window)
+            layout.group.focus(window)
+        layout.group.focus(b)
+        layout.cmd_minimize()
+        assert layout.focused is c
+        for window in (a, b, c):
+            layout.configure(window, rect)
+        assert layout.hidden == {b}
+        assert (a.geometry[2], c.geometry[0]) == (448, 450)
+        assert layout.focus_next(a) is c
+        assert layout.focus_previous(c) is a
+        layout.cmd_next()
+        assert layout.focused is a
+        layout.cmd_unminimize()
+        assert layout.focused is b
+        assert not layout.root.find_payload(b).minimized
+        layout.configure(b, rect)
+        assert layout.hidden == set()
+        assert b.geometry[2] == 298
+
+    def test_minimize_container(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        rect = Rect(0, 0, 1200, 900)
+        layout.add(a)
+        layout.group.focus(a)
+        layout.add(b)
+        layout.group.focus(b)
+        layout.cmd_mode_vertical()
+        layout.add(c)
+        layout.group.focus(c)
+        assert layout.convert_names(layout.root.tree) == ['a', ['b', 'c']]
+        layout.cmd_minimize()
+        layout.group.focus(b)
+        layout.cmd_minimize()
+        assert layout.focused is a
+        layout.configure(a, rect)
+        assert a.geometry[2] == 1198
+
+    def test_subscribe(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b = (Window(i, name) for i, name in enumerate('ab'))
+        rect = Rect(0, 0, 1000, 1000)
+        batches = []
+        layout.subscribe(batches.append)
+        layout.add(a)
+        layout.group.focus(a)
+        layout.layout([a], rect)
+        assert [(e.kind, e.window) for e in batches[0]] == \
+            [('add', a), ('focus', a), ('geometry', None)]
+        assert batches[0][-1].data == {a: (0, 0, 1000, 1000)}
+        layout.add(b)
+        layout.group.focus(b)
+        layout.cmd_grow_width(100)
+        layout.layout([a, b], rect)
+        assert [(e.kind, e.window) for e in batches[1]] == \
+            [('add', b), ('focus', b), ('resize', b), ('geometry', None)]
+        assert batches[1][-1].data == {a: (0, 0, 400, 1000),
+                                       b: (400, 0, 600, 1000)}
+        layout.layout([a, b], rect)
+        assert len(batches) == 2
+        layout.remove(b)
+        layout.layout([a], rect)
+        assert batches[2][0] == ('remove', b, None)
+        assert batches[2][1].data == {a: (0, 0, 1000, 1000), b: None}
+
+    def test_info_since(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        layout.add(a)
+        layout.group.focus(a)
+        info = layout.info()
+        assert info['tree'] == ['a']
+        assert info['group'] == 'replay'
+        assert layout.cmd_info_since(info['version']) == 'unchanged'
+        assert layout.info()['tree'] is layout.info()['tree']
+        layout.cmd_grow_width(10)
+        assert layout.cmd_info_since(info['version']) == 'unchanged'
+        layout.add(b)
+        layout.group.focus(b)
+        layout.cmd_mode_vertical()
+        layout.add(c)
+        layout.group.focus(c)
+        new = layout.cmd_info_since(info['version'])
+        assert new == {'version': info['version'] + 1,
+                       'tree_changes': [[[], ['a', ['b', 'c']]]]}
+        c.name = 'd'
+        # The names are cached until the rename is announced
+        assert layout.cmd_info_since(new['version']) == 'unchanged'
+        hook.fire('client_name_updated', c)
+        newer = layout.cmd_info_since(new['version'])
+        assert newer == {'version': new['version'] + 1,
+                         'tree_changes': [[[1, 1], 'd']]}
+        assert layout.info()['tree'] == ['a', ['b', 'd']]
+        assert layout.cmd_info_since(-1)['tree'] == ['a', ['b', 'd']]
+
+    def test_tree_changes(self):
+        assert Plasma.tree_changes(['a', ['b', 'c']], ['a', ['b', 'c']]) == []
+        assert Plasma.tree_changes(['a', ['b', 'c']], ['x', ['b', 'y']]) == \
+            [[[0], 'x'], [[1, 1], 'y']]
+        assert Plasma.tree_changes(['a', ['b', 'c']], ['a', ['b']]) == \
+            [[[1], ['b']]]
+        assert Plasma.tree_changes(['a', 'b'], ['a']) == [[[], ['a']]]
+
+    def test_geometry_command(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        layout.add(a)
+        layout.group.focus(a)
+        layout.add(b)
+        layout.group.focus(b)
+        layout.cmd_mode_vertical()
+        layout.add(c)
+        layout.group.focus(c)
+        layout.cmd_height(300)
+        layout.update_screen(Rect(0, 0, 1000, 1000))
+        assert layout.cmd_geometry() == [
+            {'id': 0, 'name': 'a', 'rect': [0, 0, 500, 1000], 'fixed': False,
+             'focused': False, 'path': [0]},
+            {'id': 1, 'name': 'b', 'rect': [500, 0, 500, 700],
+             'fixed': False, 'focused': False, 'path': [1, 0]},
+            {'id': 2, 'name': 'c', 'rect': [500, 700, 500, 300],
+             'fixed': True, 'focused': True, 'path': [1, 1]},
+        ]
+        layout.group.focus(a)
+        layout.cmd_minimize()
+        assert layout.cmd_geometry()[0]['rect'] is None
+
+    def test_batch(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        for window in (a, b, c):
+            layout.add(window)
+            layout.group.focus(window)
+        focused = []
+        layout.group.focus = focused.append
+        layout.cmd_batch(['integrate_left', 'left', ['width', 300],
+                          ['mode_vertical']])
+        assert focused == [a]
+        assert layout.focused is a
+        assert layout.convert_names(layout.root.tree) == ['a', ['b', 'c']]
+        assert layout.focused_node.width == 300
+        assert layout.add_mode is not None
+        with raises(ValueError):
+            layout.cmd_batch(['right', 'nonexistent'])
+        assert focused == [a]
+        with raises(TypeError):
+            layout.cmd_batch(['right', ['width']])
+        assert focused == [a, c]
+        assert layout.focused is c
+
+    def test_coalesced_resize(self):
+        layout = Plasma(resize_frame_interval=0.02)
+        layout.group = Group(layout)
+        layout.group.qtile = EventLoop()
+        scheduled = layout.group.qtile.timers
+        a, b = (Window(i, name) for i, name in enumerate('ab'))
+        for window in (a, b):
+            layout.add(window)
+            layout.group.focus(window)
+        focused = []
+        focus = layout.group.focus
+        layout.group.focus = lambda w: (focused.append(w), focus(w))
+        for _ in range(10):
+            layout.cmd_grow_width(10)
+        assert len(scheduled) == 1
+        assert scheduled[0].delay == 0.02
+        assert focused == []
+        node = layout.root.find_payload(b)
+        assert node.width == 600
+        scheduled[0].callback()
+        assert focused == [b]
+        layout.cmd_grow_width(10)
+        layout.cmd_left()
+        assert scheduled[1].cancelled
+
+    def test_clone(self):
+        layout = Plasma(exact_geometry=True)
+        layout.group = Group(layout)
+        layout.add(Window(0, 'a'))
+        events = []
+        layout.subscribe(events.append)
+        clone = layout.clone(Group(None))
+        assert clone.root is not layout.root
+        assert clone.root.exact
+        assert not clone.root
+        assert clone.events.subscribers == []
+        for name in ('hidden', '_geometry', '_infos', '_nodes', '_queued'):
+            assert not getattr(clone, name)
+            assert getattr(clone, name) is not getattr(layout, name)
+
+    def test_add_queue(self):
+        layout = Plasma(add_queue_delay=0.1, add_queue_max_delay=1)
+        layout.group = Group(layout)
+        layout.group.qtile = EventLoop()
+        timers = layout.group.qtile.timers
+        rect = Rect(0, 0, 900, 900)
+        a, b, c, d = (Window(i, name) for i, name in enumerate('abcd'))
+        layout.add(a)
+        timers[-1].callback()
+        layout.group.focus(a)
+        for window in (b, c, d):
+            layout.add(window)
+            layout.group.focus(window)
+            layout.configure(window, rect)
+        assert len(timers) == 4
+        assert all(t.cancelled for t in timers[1:-1])
+        assert timers[-1].delay == 0.1
+        assert layout.root.tree == [layout.find_node(a)]
+        assert layout.hidden == {b, c, d}
+        layout.remove(c)
+        timers[-1].callback()
+        assert layout.focused is d
+        assert layout.convert_names(layout.root.tree) == ['a', 'b', 'd']
+        node = layout.find_node(d)
+        assert node is layout.root.find_payload(d)
+        assert node.last_accessed > 0
+        assert node.width == 300
+        for window in (a, b, d):
+            layout.configure(window, rect)
+        assert layout.hidden == set()
+
+    def test_add_queue_mode(self):
+        layout = Plasma(add_queue_delay=0.1)
+        layout.group = Group(layout)
+        layout.group.qtile = EventLoop()
+        a, b, c, d = (Window(i, name) for i, name in enumerate('abcd'))
+        layout.add(a)
+        layout.add(b)
+        layout.group.focus(b)
+        layout.cmd_mode_vertical()
+        # The queue is inserted first, then the window is added with the mode
+        layout.add(c)
+        assert layout.convert_names(layout.root.tree) == ['a', ['b', 'c']]
+        assert layout.add_mode is None
+        layout.add(d)
+        assert layout.convert_names(layout.root.tree) == ['a', ['b', 'c']]
+
+    def test_add_queue_max_delay(self, monkeypatch):
+        layout = Plasma(add_queue_delay=0.1, add_queue_max_delay=0.25)
+        layout.group = Group(layout)
+        layout.group.qtile = EventLoop()
+        now = [10]
+        monkeypatch.setattr('time.monotonic', lambda: now[0])
+        for i in range(4):
+            layout.add(Window(i, str(i)))
+            now[0] += 0.1
+        assert [round(t.delay, 2) for t in layout.group.qtile.timers] == \
+            [0.1, 0.1, 0.05, 0]
+        layout.cmd_next()
+        assert len(layout.root) == 4
+
+    def test_drag_boundary(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        for window in (a, b, c):
+            layout.add(window)
+            layout.group.focus(window)
+        layout.group.focus(b)
+        layout.cmd_drag_boundary('right', 100)
+        nodes = [layout.find_node(w) for w in (a, b, c)]
+        assert [n.width for n in nodes] == \
+            [approx(1000 / 3), approx(1300 / 3), approx(700 / 3)]
+        layout.cmd_drag_boundary('left', -50)
+        assert [n.width for n in nodes] == \
+            [approx(1150 / 3), approx(1150 / 3), approx(700 / 3)]
+
+    def test_zoom_container(self):
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        rect = Rect(0, 0, 1000, 1000)
+        layout.add(a)
+        layout.group.focus(a)
+        layout.add(b)
+        layout.group.focus(b)
+        layout.cmd_mode_vertical()
+        layout.add(c)
+        layout.group.focus(c)
+        layout.cmd_zoom()
+        layout.cmd_zoom_container()
+        assert layout.zoomed is layout.root.find_payload(c).parent
+        for window in (a, b, c):
+            layout.configure(window, rect)
+        assert b.geometry == (0, 0, 998, 498)
+        assert c.geometry == (0, 500, 998, 498)
+        assert layout.hidden == {a}
+        # Focusing a hidden window leaves the zoom
+        layout.group.focus(a)
+        assert layout.zoomed is None
+
     @plasma_config
     def test_info(self, qtile):
         qtile.test_window('a')
@@ -219,6 +716,16 @@ class TestLayout:
         qtile.c.layout.recent()
         assert_focused(qtile, 'c')
 
+    @plasma_config
+    def test_profile(self, qtile, tmp_path):
+        path = tmp_path / 'plasma.prof'
+        qtile.test_window('a')
+        qtile.c.layout.profile(0.2, str(path))
+        qtile.test_window('b')
+        time.sleep(0.5)
+        qtile.c.layout.info()
+        assert path.exists()
+
     def test_bug_10(self):
         """Adding nodes when the correct root dimensions are still unknown
         should not raise an error.
@@ -1,12 +1,35 @@
+import sys
+
 import pytest
 from pytest import approx
 
 from plasma.debug import draw, info # noqa
-from plasma.node import Node, HORIZONTAL, AddMode, NotRestorableError
+from plasma.node import (Node, HORIZONTAL, VERTICAL, UP, DOWN, LEFT, RIGHT,
+                         AddMode, NotRestorableError, ProportionalNode,
+                         ContainerMode, FLIPPED)
+from plasma.sizing import Orient, distribute
 
 from .conftest import Nodes
 
 
+class TestConstants:
+
+    def test_orient(self):
+        assert (HORIZONTAL, VERTICAL) == (Orient.HORIZONTAL, Orient.VERTICAL)
+        assert FLIPPED[HORIZONTAL] is VERTICAL is ~HORIZONTAL
+        assert FLIPPED[VERTICAL] is HORIZONTAL is ~VERTICAL
+
+    def test_direction(self):
+        assert [d.orient for d in (UP, DOWN, LEFT, RIGHT)] == \
+            [VERTICAL, VERTICAL, HORIZONTAL, HORIZONTAL]
+        assert [d.offset for d in (UP, DOWN, LEFT, RIGHT)] == [-1, 1, -1, 1]
+
+    def test_add_mode(self):
+        assert AddMode.HORIZONTAL.orient is HORIZONTAL
+        assert AddMode.VERTICAL.orient is VERTICAL
+        assert (AddMode.HORIZONTAL | AddMode.SPLIT).orient is HORIZONTAL
+        assert (AddMode.VERTICAL | AddMode.SPLIT).orient is VERTICAL
+
 class TestNode:
 
     def test_single_node(self):
@@ -52,6 +75,16 @@ class TestNode:
         assert b.pos == (40, 0)
         assert c.pos == (80, 0)
 
+    def test_add_children_at_once(self, root):
+        a, b, c, d = Nodes('a b c d')
+        root.add_child(a)
+        root.add_child(b)
+        a.width = 40
+        b.width = 80
+        root.add_children([c, d], idx=1)
+        assert root.tree == [a, c, d, b]
+        assert (a.width, c.width, d.width, b.width) == (20, 30, 30, 40)
+
     def test_add_child_after(self, root, grid):
         a, b, c, d, e = grid
         f = Node('f')
@@ -426,6 +459,40 @@ class TestNode:
         a.add_node(g, mode=AddMode.VERTICAL | AddMode.SPLIT)
         assert root.tree == [[a, g], f, [c, e, d], b]
 
+    def test_geometry(self, root, complex_grid):
+        a, b, c, d, e, f, g = complex_grid
+        d.size = 20
+        f.size += 5
+        a.size -= 10
+        geometry = list(root.geometry())
+        assert [geo.node for geo in geometry] == [
+            root, a, b.parent, b, d.parent, c.parent, c, f.parent, f, g, d, e]
+        for geo in geometry:
+            node = geo.node
+            assert geo.depth == len(list(_ancestors(node)))
+            assert geo.orient is node.orient
+            assert (geo.x, geo.y) == node.pos
+            assert (geo.width, geo.height) == (node.width, node.height)
+            assert geo.size == node.size
+            assert geo.flexible == node.flexible
+
+    def test_geometry_subtree(self, root, grid):
+        a, b, c, d, e = grid
+        c.size = 30
+        geometry = list(c.parent.geometry())
+        assert [geo.node for geo in geometry] == [c.parent, c, d, e]
+        assert geometry[0].depth == 0
+        for geo in geometry:
+            assert (geo.x, geo.y, geo.width, geo.height) == \
+                (geo.node.x, geo.node.y, geo.node.width, geo.node.height)
+
+    def test_geometry_rect(self, root, grid):
+        a, b, c, d, e = grid
+        geometry = list(c.parent.geometry((0, 0, 120, 50)))
+        assert [(geo.x, geo.y, geo.width, geo.height) for geo in geometry] == \
+            [(0, 0, 120, 50), (0, 0, 40, 50), (40, 0, 40, 50),
+             (80, 0, 40, 50)]
+
     def test_contains(self, root, grid):
         x = Node('x')
         nodes = list(grid)
@@ -686,6 +753,28 @@ class TestSizes:
         root.size = 10
         assert a._size is b._size is root._size is None
 
+    def test_rescale(self, root, small_grid):
+        a, b, c, d = small_grid
+        a.width = 30
+        c.height = 20
+        root.rescale(240, 100)
+        assert (root.width, root.height) == (240, 100)
+        assert a.width == 60
+        assert c.height == 40
+        assert b.height == 60
+
+    def test_version(self, root, tiny_grid):
+        a, b, c = tiny_grid
+        version = root.version
+        a.width += 10
+        assert root.version > version
+        version = root.version
+        a.access()
+        list(root.geometry())
+        assert root.version == version
+        c.move(UP)
+        assert root.version > version
+
     def test_set_xy(self, root, tiny_grid):
         a, b, c = tiny_grid
         root.x = 10
@@ -900,6 +989,46 @@ class TestSizes:
         assert a.width == 110
         assert b.width == c.width == 10
 
+class TestMoveBoundary:
+
+    def test_siblings(self, root):
+        a, b, c = Nodes('a b c')
+        for node in (a, b, c):
+            root.add_child(node)
+        assert a.move_boundary(RIGHT, 10)
+        assert (a.width, b.width, c.width) == (50, 30, 40)
+        assert a.fixed and b.fixed and not c.fixed
+        assert c.move_boundary(LEFT, 5)
+        assert (a.width, b.width, c.width) == (50, 25, 45)
+
+    def test_ancestor(self, root, small_grid):
+        a, b, c, d = small_grid
+        assert c.move_boundary(RIGHT, 10)
+        assert (a.width, c.width, d.width) == (60, 40, 20)
+        assert b.move_boundary(DOWN, 5)
+        assert (b.height, c.height) == (30, 20)
+        assert c.move_boundary(LEFT, 20)
+        assert (a.width, c.parent.width) == (40, 80)
+        assert (c.width, d.width) == (approx(160 / 3), approx(80 / 3))
+        assert c.height == 20
+
+    def test_bounds(self, root, small_grid):
+        a, b, c, d = small_grid
+        assert not a.move_boundary(LEFT, 10)
+        assert not d.move_boundary(RIGHT, 10)
+        assert c.move_boundary(RIGHT, 100)
+        assert d.width == d.min_size_bound
+        assert c.width == 60 - d.min_size_bound
+        assert not c.move_boundary(RIGHT, 1)
+
+    def test_minimized(self, root):
+        a, b, c = Nodes('a b c')
+        for node in (a, b, c):
+            root.add_child(node)
+        b.minimize()
+        assert a.move_boundary(RIGHT, 10)
+        assert (a.width, c.width) == (70, 50)
+
 class TestRestore:
 
     def test_restore(self, root, grid):
@@ -1040,11 +1169,480 @@ class TestRestore:
         c.size = 30
         d.size += 10
         b.remove()
-        assert c.size == c.height == 10
-        assert d.size == d.height == 20
+        # The container of c and d is merged into the root, so they stay
+        # side by side
+        assert root.tree == [a, c, d]
+        assert c.size == c.width == 20
+        assert d.size == d.width == 40
+        assert c.height == d.height == 30
         root.restore(b)
         assert b.height == 15
         assert b.width == 60
         assert c.height == d.height == 15
         assert c.width == 20
         assert d.width == 40
+
+class ExactNode(Node):
+    exact = True
+
+class TestContainerMode:
+
+    def test_tabbed(self, root, small_grid):
+        a, b, c, d = small_grid
+        container = b.parent
+        a.access()
+        c.access()
+        container.container_mode = ContainerMode.TABBED
+        assert container.active_child is c.parent
+        for node in (b, c.parent):
+            assert (node.pos, node.width, node.height) == \
+                (container.pos, container.width, container.height)
+        assert (c.width, d.width) == (30, 30)
+        assert d.x == 90
+
+    def test_geometry(self, root, small_grid):
+        a, b, c, d = small_grid
+        b.parent.container_mode = ContainerMode.STACKED
+        b.access()
+        nodes = [geo.node for geo in root.geometry()]
+        assert nodes == [root, a, b.parent, b]
+        for geo in root.geometry():
+            node = geo.node
+            assert (geo.x, geo.y, geo.width, geo.height) == \
+                (node.x, node.y, node.width, node.height)
+            assert geo.size == node.size
+
+    def test_access_switches_child(self, root, small_grid):
+        a, b, c, d = small_grid
+        b.parent.container_mode = ContainerMode.TABBED
+        b.access()
+        version = root.version
+        d.access()
+        assert root.version > version
+        assert [geo.node for geo in root.geometry()][-3:] == \
+            [c.parent, c, d]
+
+    def test_close_neighbor(self, root, small_grid):
+        a, b, c, d = small_grid
+        b.parent.container_mode = ContainerMode.TABBED
+        c.access()
+        assert a.close_right is c
+        assert b.close_left is None
+        assert c.close_up is None
+
+    def test_close_neighbor_switches_child(self, root, small_grid):
+        a, b, c, d = small_grid
+        tabs = b.parent
+        tabs.container_mode = ContainerMode.TABBED
+        c.access()
+        # Tabs are switched horizontally, unless a window is visible there
+        assert c.close_left is b
+        assert d.close_left is c
+        assert c.close_right is d
+        b.access()
+        assert b.close_right is c
+        assert b.close_left is a
+        assert b.close_down is None
+        tabs.container_mode = ContainerMode.STACKED
+        assert b.close_down is c
+        assert b.close_right is None
+        c.access()
+        assert c.close_up is b
+        assert c.close_left is a
+
+    def test_resize_ignored(self, root, small_grid):
+        a, b, c, d = small_grid
+        b.parent.container_mode = ContainerMode.TABBED
+        b.height = 10
+        assert b.height == 50
+        assert not b.fixed
+
+class TestMinimize:
+
+    def test_minimize(self, root, small_grid):
+        a, b, c, d = small_grid
+        tree = root.tree
+        b.minimize()
+        assert b.minimized
+        assert b.size == 0
+        assert b.min_size == 0
+        assert not b.flexible
+        assert root.tree == tree
+        assert (c.y, c.height) == (0, 50)
+        assert b not in [geo.node for geo in root.geometry()]
+        b.unminimize()
+        assert not b.minimized
+        assert (b.height, c.y, c.height) == (25, 25, 25)
+
+    def test_fixed(self, root, small_grid):
+        a, b, c, d = small_grid
+        a.width = 40
+        a.minimize()
+        assert (b.x, b.width) == (0, 120)
+        a.unminimize()
+        assert (a.width, b.x, b.width) == (40, 40, 80)
+
+    def test_fixed_siblings(self, root):
+        a, b = Nodes('a b')
+        root.add_child(a)
+        root.add_child(b)
+        a.width = 80
+        b.width = 40
+        b.minimize()
+        assert a.width == 120
+        b.unminimize()
+        assert (a.width, b.width) == (80, 40)
+
+    def test_neighbors(self, root, small_grid):
+        a, b, c, d = small_grid
+        c.minimize()
+        assert (d.x, d.width) == (60, 60)
+        assert d.left is a
+        assert d.close_left is a
+        assert a.close_right in (b, d)
+        assert c.close_left is None
+        b.minimize()
+        assert d.up is None
+
+    def test_geometry(self, root, small_grid):
+        a, b, c, d = small_grid
+        c.minimize()
+        for geo in root.geometry():
+            node = geo.node
+            assert (geo.x, geo.y, geo.width, geo.height) == \
+                (node.x, node.y, node.width, node.height)
+
+    def test_remove(self, root, small_grid):
+        a, b, c, d = small_grid
+        a.width = 40
+        a.minimize()
+        a.remove()
+        root.restore(a)
+        assert not a.minimized
+        assert a.width == 40
+
+    def test_all_children_minimized(self):
+        root = Node(None, 0, 0, 1200, 600)
+        a, b, c = Nodes('a b c')
+        root.add_child(a)
+        root.add_child(b)
+        b.flip_with(c)
+        c.minimize()
+        b.minimize()
+        container = b.parent
+        assert container.minimized
+        assert container.size == 0
+        assert (a.x, a.width) == (0, 1200)
+        b.unminimize()
+        assert not container.minimized
+        assert (a.width, b.height) == (600, 600)
+        assert c.minimized
+
+    def test_remove_leaving_minimized(self, root, small_grid):
+        a, b, c, d = small_grid
+        b.minimize()
+        c.minimize()
+        assert a.width == 60
+        d.remove()
+        assert root.tree == [a, [b, c]]
+        assert b.parent.minimized
+        assert a.width == 120
+
+    def test_add_to_minimized(self, root, tiny_grid):
+        a, b, c = tiny_grid
+        b.minimize()
+        c.minimize()
+        assert a.width == 120
+        d = Node('d')
+        c.add_node(d, AddMode.VERTICAL | AddMode.SPLIT)
+        assert not d.parent.minimized
+        assert (a.width, d.height) == (60, 50)
+
+    def test_split_minimized(self, root, small_grid):
+        a, b, c, d = small_grid
+        c.minimize()
+        e = Node('e')
+        c.add_node(e, AddMode.HORIZONTAL | AddMode.SPLIT)
+        assert e.size > 0
+        assert d.width + e.width == approx(60)
+
+class TestDeepTree:
+
+    depth = 400
+
+    @pytest.fixture
+    def chain(self, root):
+        """Build a tree nested deeper than the recursion limit allows for
+        recursive traversal.
+        """
+        container = root
+        leafs = []
+        for i in range(self.depth):
+            leaf, next_container = Node('leaf%d' % i), Node()
+            for child in (leaf, next_container):
+                container.children.append(child)
+                child.parent = container
+            leafs.append(leaf)
+            container = next_container
+        # Replace the last (empty) container
+        last = Node('last')
+        container.parent.children[-1] = last
+        last.parent = container.parent
+        leafs.append(last)
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        yield leafs
+        sys.setrecursionlimit(limit)
+
+    def test_traversal(self, root, chain):
+        last = chain[-1]
+        assert len(list(root.all_leafs)) == self.depth + 1
+        assert last in root
+        assert root.find_payload('last') is last
+        assert len(root.tree) == 2
+        assert root.first_leaf is chain[0]
+        assert root.last_leaf is last
+        assert last.root is root
+        assert last.prev_leaf is chain[-2]
+        assert chain[-2].next_leaf is last
+        assert last.orient is HORIZONTAL
+        last.access()
+        assert root.recent_leaf is last
+        assert last.neighbor(UP) is chain[-2]
+
+    def test_geometry(self, root, chain):
+        last = chain[-1]
+        assert last.x_end == approx(120)
+        assert last.y_end == approx(50)
+        assert last.flexible
+        assert root[1].min_size > 0
+        assert root[1].min_size_bound > 0
+        assert len(list(root.geometry())) == 2 * self.depth + 1
+
+    def test_fit_into(self, root, chain):
+        root[0].force_size(30)
+        assert root[0].width == 30
+        assert root[1].width == 90
+
+class TestNormalize:
+
+    def test_collapse_root(self, root, small_grid):
+        a, b, c, d = small_grid
+        a.remove()
+        # The root's only child is the vertical container of b
+        assert len(root) == 1
+        assert not root.collapse()
+        assert root.orient is HORIZONTAL
+        assert root.tree == [[b, [c, d]]]
+        assert root.normalize() == 0
+
+    def test_collapse_leaf(self, root, tiny_grid):
+        a, b, c = tiny_grid
+        container = b.parent
+        container.children.remove(c)
+        assert container.collapse()
+        assert root.tree == [a, b]
+        assert b.parent is root
+
+    def test_collapse_merges_grandchildren(self, root):
+        a, b, c, d = Nodes('a b c d')
+        root.add_child(a)
+        root.add_child(b)
+        b.flip_with(c)
+        c.flip_with(d)
+        # Make the container of c and d the only child of its parent
+        b.parent.children.remove(b)
+        container = c.parent.parent
+        widths = [n.width for n in (a, c, d)]
+        assert container.collapse()
+        assert root.tree == [a, c, d]
+        assert [n.width for n in (a, c, d)] == approx(widths)
+        assert (c.height, d.height) == (50, 50)
+
+    def test_remove_keeps_orientation(self, root):
+        a, b, c, d = Nodes('a b c d')
+        root.add_child(a)
+        root.add_child(b)
+        b.flip_with(c)
+        c.flip_with(d)
+        rects = [(n.x, n.y, n.width, n.height) for n in (c, d)]
+        assert c.y == d.y and c.x < d.x
+        b.remove()
+        assert root.tree == [a, c, d]
+        assert c.y == d.y and c.x < d.x
+        assert (c.width, d.width) == (rects[0][2], rects[1][2])
+        root.restore(b)
+        assert root.tree == [a, [b, [c, d]]]
+        assert c.y == d.y and c.x < d.x
+
+    def test_remove_keeps_tabbed_container(self, root, small_grid):
+        a, b, c, d = small_grid
+        container = c.parent
+        container.container_mode = ContainerMode.TABBED
+        b.remove()
+        # Merging would show both windows
+        assert root.tree == [a, [[c, d]]]
+        assert c.parent is container
+        assert container.active_child.x == a.x_end
+
+    def test_normalize(self, root):
+        a, b, c, d = Nodes('a b c d')
+        root.add_child(a)
+        root.add_child(b)
+        b.flip_with(c)
+        c.flip_with(d)
+        b.parent.children.remove(b)
+        root.children.remove(a)
+        assert root.normalize() == 1
+        assert root.orient is HORIZONTAL
+        assert root.tree == [c, d]
+        assert root.normalize() == 0
+
+class TestExact:
+
+    @pytest.fixture
+    def root(self):
+        return ExactNode('root', 0, 0, 100, 50)
+
+    def test_distribute(self):
+        assert distribute(10, [1, 1, 1]) == [4, 3, 3]
+        assert distribute(11, [1, 1, 1]) == [4, 4, 3]
+        assert distribute(10, [1, 2, 2]) == [2, 4, 4]
+        assert distribute(7, [0, 0]) == [4, 3]
+        assert sum(distribute(1000, [3, 7, 11, 13])) == 1000
+
+    def test_flexible_sizes(self, root):
+        a, b, c = (ExactNode(x) for x in 'abc')
+        root.add_child(a)
+        root.add_child(b)
+        root.add_child(c)
+        assert [n.size for n in (a, b, c)] == [34, 33, 33]
+        assert [n.x for n in (a, b, c)] == [0, 34, 67]
+        assert c.x_end == 100
+        assert all(isinstance(n.x, int) for n in (a, b, c))
+
+    def test_fixed_sizes(self, root):
+        a, b, c, d = (ExactNode(x) for x in 'abcd')
+        root.add_child(a)
+        root.add_child(b)
+        a.size = 33.4
+        assert a.size == 33
+        root.add_child(c)
+        assert a.size + b.size + c.size == 100
+        b.flip_with(d)
+        c.size = 30
+        assert a.size + b.parent.size + c.size == 100
+        assert all(isinstance(n.size, int) for n in (a, b.parent, c))
+
+    def test_split(self, root):
+        a, b = ExactNode('a'), ExactNode('b')
+        root.add_child(a)
+        root.add_child(ExactNode('x'))
+        a.size = 41
+        a.add_node(b, AddMode.HORIZONTAL | AddMode.SPLIT)
+        assert (a.size, b.size) == (21, 20)
+        assert type(b.parent) is ExactNode
+
+    def test_flip_keeps_class(self, root):
+        a, b, c = (ExactNode(x) for x in 'abc')
+        root.add_child(a)
+        root.add_child(b)
+        b.flip_with(c)
+        assert type(b.parent) is ExactNode
+
+    def test_pixel_perfect(self, root):
+        nodes = [ExactNode(x) for x in 'abcdefg']
+        root.add_child(nodes[0])
+        for prev, node in zip(nodes, nodes[1:]):
+            prev.parent.add_child(node)
+        nodes[3].flip_with(ExactNode('h'))
+        for leaf in root.all_leafs:
+            assert leaf.pixel_perfect == (leaf.x, leaf.y, leaf.width,
+                                          leaf.height)
+        assert sum(leaf.width for leaf in root.all_leafs if leaf.y == 0) == \
+            100
+
+    def test_close_neighbor(self, root):
+        a, b, c, d, e, f = (ExactNode(x) for x in 'abcdef')
+        root.add_child(a)
+        root.add_child(b)
+        root.add_child(c)
+        a.flip_with(d)
+        d.parent.add_child(e)
+        c.flip_with(f)
+        assert d.close_right is b
+        assert b.close_right is c
+        assert f.close_left is b
+        assert e.close_up is d
+        assert a.close_up is None
+
+    def test_geometry(self, root):
+        a, b, c, d = (ExactNode(x) for x in 'abcd')
+        root.add_child(a)
+        root.add_child(b)
+        root.add_child(c)
+        b.flip_with(d)
+        d.height = 17
+        for geo in root.geometry():
+            node = geo.node
+            assert (geo.x, geo.y, geo.width, geo.height) == \
+                (node.x, node.y, node.width, node.height)
+
+class TestProportional:
+
+    @pytest.fixture
+    def root(self):
+        return ProportionalNode('root', 0, 0, 120, 50)
+
+    @pytest.fixture
+    def grid(self, root):
+        a, b, c, d = (ProportionalNode(x) for x in 'abcd')
+        root.add_child(a)
+        root.add_child(b)
+        b.flip_with(c)
+        c.flip_with(d)
+        return a, b, c, d
+
+    def test_sizes(self, root, grid):
+        a, b, c, d = grid
+        a.width = 30
+        c.height = 20
+        d.width = 60
+        assert (a.width, c.height, d.width) == (30, 20, 60)
+        assert a._ratio == approx(0.25)
+        assert c.parent._ratio == approx(0.4)
+        assert d._ratio == approx(0.5)
+
+    def test_screen_change(self, root, grid):
+        a, b, c, d = grid
+        a.width = 30
+        c.height = 20
+        d.width = 60
+        root.width, root.height = 240, 200
+        assert a.width == approx(60)
+        assert b.width == approx(180)
+        assert c.height == approx(80)
+        assert b.height == approx(120)
+        assert d.width == approx(120)
+        assert c.width == approx(60)
+
+    def test_restore(self, root, grid):
+        a, b, c, d = grid
+        a.width = 30
+        a.remove()
+        root.width = 240
+        root.restore(a)
+        assert a.width == approx(30)
+
+    def test_flip_keeps_class(self, root, grid):
+        a, b, c, d = grid
+        assert type(c.parent) is ProportionalNode
+
+    def test_exact_rejected(self):
+        with pytest.raises(ValueError):
+            type('Node', (ProportionalNode,), {'exact': True})()
+
+def _ancestors(node):
+    while node.parent is not None:
+        node = node.parent
+        yield node
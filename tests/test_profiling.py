@@ -0,0 +1,44 @@
+import pstats
+
+import pytest
+
+from plasma import profiling
+
+from .conftest import Nodes
+
+
+def build(root):
+    a, b, c = Nodes('a b c')
+    root.add_child(a)
+    root.add_child(b)
+    b.flip_with(c)
+    return c.pixel_perfect
+
+class TestProfiling:
+
+    def test_profile(self, root, tmp_path):
+        path = str(tmp_path / 'plasma.prof')
+        profiling.start()
+        build(root)
+        profiling.stop(path)
+        stats = pstats.Stats(path)
+        files = {f for f, _, _ in stats.stats}
+        assert files
+        assert all('plasma/' in f for f in files)
+        assert any(name == 'flip_with' for _, _, name in stats.stats)
+
+    def test_profile_unfiltered(self, root, tmp_path):
+        path = str(tmp_path / 'all.prof')
+        profiling.start()
+        build(root)
+        profiling.stop(path, pattern=None)
+        stats = pstats.Stats(path)
+        assert any('plasma/' not in f for f, _, _ in stats.stats)
+
+    def test_profile_twice(self, tmp_path):
+        profiling.start()
+        with pytest.raises(profiling.ProfilingError):
+            profiling.start()
+        profiling.stop(str(tmp_path / 'x.prof'))
+        with pytest.raises(profiling.ProfilingError):
+            profiling.stop(str(tmp_path / 'x.prof'))
@@ -0,0 +1,125 @@
+import json
+
+from plasma import Plasma
+from plasma.record import read
+from plasma.replay import Group, Rect, Window, replay, shape, shapes
+
+
+def session(layout):
+    """Simulate a short session and return the tree shape after each call."""
+    res = []
+    rect = Rect(0, 0, 800, 600)
+    a, b, c, d = (Window(i, name) for i, name in enumerate('abcd'))
+    def step(func, *args):
+        func(*args)
+        res.append(shape(layout))
+    for window in (a, b):
+        step(layout.add, window)
+        step(layout.group.focus, window)
+    step(layout.cmd_mode_vertical)
+    step(layout.add, c)
+    step(layout.group.focus, c)
+    step(layout.cmd_grow_height, 50)
+    step(layout.cmd_integrate_left)
+    step(layout.add, d)
+    step(layout.remove, b)
+    for window in (a, c, d):
+        step(layout.configure, window, rect)
+    return res
+
+class TestRecord:
+
+    def test_record(self, tmp_path):
+        path = str(tmp_path / 'session.jsonl')
+        layout = Plasma()
+        layout.group = Group(layout)
+        layout.cmd_start_recording(path)
+        expected = session(layout)
+        layout.cmd_stop_recording()
+        assert layout.recorder is None
+        header, calls = read(path)
+        assert header['tree']['children'] == []
+        assert [c[0] for c in calls[:4]] == ['add', 'focus', 'add', 'focus']
+        assert calls[0][1] == [{'id': 0, 'name': 'a'}]
+        assert calls[-1] == ['configure', [{'id': 3, 'name': 'd'},
+                                           [0, 0, 800, 600]], {}]
+        # Nested focus() calls caused by refocus() are not recorded
+        assert len(calls) == len(expected)
+        assert shapes(path) == expected
+
+    def test_replay_initial_state(self, tmp_path):
+        path = str(tmp_path / 'session.jsonl')
+        layout = Plasma()
+        layout.group = Group(layout)
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        layout.add(a)
+        layout.add(b)
+        layout.root.find_payload(b).size = 300
+        layout.group.focus(b)
+        layout.cmd_start_recording(path)
+        layout.add(c)
+        layout.cmd_stop_recording()
+        replayed = replay(path)
+        assert [n.payload.name for n in replayed.root] == ['a', 'b', 'c']
+        assert replayed.focused.name == 'b'
+        assert replayed.root.find_payload(replayed.focused).size == \
+            layout.root.find_payload(b).size
+        with open(path) as f:
+            assert len(f.readlines()) == 2
+        assert json.loads(open(path).readline())['focused'] == 1
+
+    def test_replay_proportional(self, tmp_path):
+        path = str(tmp_path / 'session.jsonl')
+        layout = Plasma(proportional_sizes=True)
+        layout.group = Group(layout)
+        a, b = Window(0, 'a'), Window(1, 'b')
+        layout.add(a)
+        layout.add(b)
+        layout.root.find_payload(b).size = 300
+        layout.cmd_start_recording(path)
+        layout.cmd_stop_recording()
+        replayed = replay(path, Plasma(proportional_sizes=True))
+        assert replayed.root[1].size == 300
+
+    def test_replay_config_and_timers(self, tmp_path):
+        path = str(tmp_path / 'session.jsonl')
+        layout = Plasma(exact_geometry=True, add_queue_delay=0.1,
+                        resize_frame_interval=0.05)
+        layout.group = Group(layout)
+        layout.cmd_start_recording(path)
+        expected = []
+        a, b, c = (Window(i, name) for i, name in enumerate('abc'))
+        layout.add(a)
+        layout.add(b)
+        expected.append(shape(layout))
+        # Qtile calls these when the timers are due
+        layout.insert_queued()
+        expected.append(shape(layout))
+        layout.group.focus(a)
+        layout.add(c)
+        layout.insert_queued()
+        layout.cmd_grow_width(50)
+        layout._scheduled_refocus()
+        expected.append(shape(layout))
+        layout.cmd_stop_recording()
+        header, calls = read(path)
+        assert header['config']['add_queue_delay'] == 0.1
+        assert [c[0] for c in calls].count('insert_queued') == 2
+        assert '_scheduled_refocus' in [c[0] for c in calls]
+        replayed = replay(path)
+        assert replayed.exact_geometry
+        assert replayed.resize_frame_interval == 0.05
+        assert shape(replayed) == expected[-1]
+        assert replayed.root[0].size == layout.root[0].size
+        assert shapes(path)[2] == expected[1]
+
+    def test_recording_inserts_queue(self, tmp_path):
+        path = str(tmp_path / 'session.jsonl')
+        layout = Plasma(add_queue_delay=0.1)
+        layout.group = Group(layout)
+        layout.add(Window(0, 'a'))
+        layout.cmd_start_recording(path)
+        layout.cmd_stop_recording()
+        header, _ = read(path)
+        assert len(header['tree']['children']) == 1
+        assert replay(path).root[0].payload.name == 'a'
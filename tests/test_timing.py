@@ -0,0 +1,69 @@
+from plasma.timing import Histogram, Latencies, instrument
+
+
+class TestTiming:
+
+    def test_histogram(self):
+        h = Histogram(100)
+        for i in range(1, 101):
+            h.add(i / 1000)
+        summary = h.summary()
+        assert summary['count'] == 100
+        assert summary['p50'] == 50
+        assert summary['p95'] == 95
+        assert summary['p99'] == 99
+        assert summary['max'] == 100
+
+    def test_histogram_rolling(self):
+        h = Histogram(10)
+        h.add(5)
+        for i in range(100):
+            h.add(1)
+        h.add(0.5)
+        assert len(h.samples) == 10
+        assert h.summary()['count'] == 102
+        assert h.summary()['max'] == 1000
+
+    def test_empty_histogram(self):
+        summary = Histogram(10).summary()
+        assert summary['count'] == 0
+        assert summary['p50'] is None
+        assert summary['max'] is None
+
+    def test_instrument(self):
+        @instrument('foo')
+        class Foo:
+            latencies = Latencies()
+            recorder = None
+
+            def foo(self):
+                return 1
+
+            def bar(self):
+                return 2
+
+            def cmd_baz(self, x):
+                """Baz."""
+                return x
+
+        foo = Foo()
+        assert foo.foo() == 1
+        assert foo.bar() == 2
+        assert foo.cmd_baz(3) == 3
+        assert foo.cmd_baz.__doc__ == 'Baz.'
+        summary = foo.latencies.summary()
+        assert set(summary) == {'foo', 'cmd_baz'}
+        assert summary['foo']['count'] == 1
+        foo.latencies.reset()
+        assert foo.latencies.summary() == {}
+
+    def test_disabled(self):
+        @instrument()
+        class Foo:
+            latencies = None
+            recorder = None
+
+            def cmd_foo(self):
+                return 1
+
+        assert Foo().cmd_foo() == 1
@@ -0,0 +1,83 @@
+import json
+
+from plasma import Plasma, trace
+from plasma.node import Node
+from plasma.replay import Window
+
+from .conftest import Nodes
+
+
+class TestTrace:
+
+    def test_trace(self, root, tmp_path):
+        path = str(tmp_path / 'trace.json')
+        trace.start(path)
+        try:
+            a, b, c = Nodes('a b c')
+            root.add_child(a)
+            root.add_child(b)
+            b.flip_with(c)
+            with trace.span('custom', 'test', {'foo': 1}):
+                pass
+        finally:
+            trace.stop()
+        with open(path) as f:
+            events = json.load(f)
+        names = {e['name'] for e in events}
+        assert {'Node.add_child', 'Node.flip_with', 'Node.fit_into',
+                'custom'} <= names
+        custom = next(e for e in events if e['name'] == 'custom')
+        assert custom['ph'] == 'X'
+        assert custom['cat'] == 'test'
+        assert custom['args'] == {'foo': 1}
+        assert custom['dur'] >= 0
+
+    def test_geometry(self, tmp_path):
+        path = str(tmp_path / 'trace.json')
+        layout = Plasma()
+        layout.add(Window(0, 'a'))
+        trace.start(path)
+        try:
+            layout.geometry(layout.root)
+            layout.geometry(layout.root)
+        finally:
+            trace.stop()
+        with open(path) as f:
+            events = json.load(f)
+        spans = [e for e in events if e['cat'] == 'geometry']
+        assert [e['name'] for e in spans] == ['geometry']
+
+    def test_finalize(self, tmp_path):
+        layout = Plasma(trace_path=str(tmp_path / 'trace.json'))
+        tracer = trace.tracer
+        try:
+            other = Plasma()
+            clone = layout.clone(None)
+            other.finalize()
+            clone.finalize()
+            assert trace.tracer is tracer
+            layout.finalize()
+            assert trace.tracer is None
+        finally:
+            trace.stop()
+
+    def test_bulk_flush(self, tmp_path):
+        path = str(tmp_path / 'trace.json')
+        trace.start(path, buffer_size=3)
+        try:
+            for i in range(10):
+                trace.tracer.add(str(i), 'test', 0, 1)
+            assert len(trace.tracer.events) == 1
+            assert trace.tracer.written == 9
+        finally:
+            trace.stop()
+        assert trace.tracer is None
+        with open(path) as f:
+            assert [e['name'] for e in json.load(f)] == list('0123456789')
+
+    def test_inactive(self):
+        assert trace.tracer is None
+        assert trace.span('x', 'y') is trace.null_span
+        root = Node(None, 0, 0, 100, 100)
+        root.add_child(Node('a'))
+        trace.stop()
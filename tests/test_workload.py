@@ -0,0 +1,69 @@
+from collections import Counter
+
+import pytest
+
+from plasma.workload import Workload, Runner, default_weights
+
+
+class TestWorkload:
+
+    def test_reproducible(self):
+        assert list(Workload(seed=1, steps=100)) == \
+            list(Workload(seed=1, steps=100))
+        assert list(Workload(seed=1, steps=100)) != \
+            list(Workload(seed=2, steps=100))
+
+    def test_login_burst(self):
+        ops = list(Workload(steps=0, login_windows=15))
+        assert len(ops) == 15
+        assert all(op.kind == 'open' for op in ops)
+        assert len({op.payload for op in ops}) == 15
+
+    def test_weights(self):
+        ops = list(Workload(steps=200, login_windows=5, weights={
+            'open': 0, 'close': 0, 'integrate': 0, 'move': 0, 'resize': 0}))
+        assert Counter(op.kind for op in ops[5:]) == {'focus': 200}
+
+    def test_key_repeat(self):
+        ops = list(Workload(steps=50, login_windows=5, repeat=(7, 7),
+                            weights={'focus': 1, 'resize': 0, 'open': 0,
+                                     'close': 0, 'integrate': 0, 'move': 0}))
+        assert ops[5:12] == [ops[5]] * 7
+
+    def test_max_windows(self):
+        alive = set()
+        for op in Workload(steps=300, login_windows=20, max_windows=10):
+            if op.kind == 'open':
+                alive.add(op.payload)
+            elif op.kind == 'close':
+                alive.remove(op.payload)
+            assert len(alive) <= 10
+
+    def test_only_open(self):
+        ops = list(Workload(steps=50, login_windows=5, max_windows=10,
+                            weights={'open': 1, 'close': 0, 'focus': 0,
+                                     'resize': 0, 'integrate': 0,
+                                     'move': 0}))
+        assert len(ops) == 55
+        assert {op.kind for op in ops} == {'open', 'close'}
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            Workload(max_windows=0)
+        with pytest.raises(ValueError):
+            Workload(weights=dict.fromkeys(default_weights, 0))
+
+    def test_run(self):
+        ops = list(Workload(seed=3, steps=150, login_windows=8,
+                            max_windows=12))
+        runner = Runner()
+        root = runner.run(ops)
+        alive = set()
+        for op in ops:
+            if op.kind == 'open':
+                alive.add(op.payload)
+            elif op.kind == 'close':
+                alive.remove(op.payload)
+        assert {n.payload for n in root.all_leafs} == alive
+        assert runner.focused in root
+        assert sum(c.size for c in root) == root.capacity
@@ -0,0 +1,52 @@
+"""Benchmark the node engine with synthetic workloads.
+
+For each window count, a seeded workload is generated and applied to a fresh
+tree. The total and per-operation time is reported for every operation kind,
+which shows how the engine scales with the number of windows.
+
+Usage: python tools/benchmark.py [--windows 10 20 40] [--steps 500] [--seed 0]
+"""
+
+import argparse
+from collections import defaultdict
+from pathlib import Path
+import sys
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from plasma.workload import Workload, Runner  # noqa: E402
+
+
+def benchmark(windows, steps, seed):
+    workload = Workload(seed=seed, steps=steps, login_windows=windows,
+                        max_windows=windows)
+    runner = Runner()
+    times = defaultdict(float)
+    counts = defaultdict(int)
+    for op in workload:
+        start = perf_counter()
+        runner.apply(op)
+        times[op.kind] += perf_counter() - start
+        counts[op.kind] += 1
+    return times, counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--windows', type=int, nargs='+',
+                        default=[10, 20, 40])
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print('%8s %10s %8s %12s %12s' % ('windows', 'op', 'count', 'total ms',
+                                      'per op us'))
+    for windows in args.windows:
+        times, counts = benchmark(windows, args.steps, args.seed)
+        for kind in sorted(times):
+            print('%8d %10s %8d %12.2f %12.2f' % (
+                windows, kind, counts[kind], times[kind] * 1e3,
+                times[kind] / counts[kind] * 1e6))
+
+if __name__ == '__main__':
+    main()